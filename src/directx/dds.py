@@ -9,10 +9,11 @@ Notes:
 
 import ctypes as c
 from enum import IntEnum
+import io
 from io import IOBase
 import os
 
-from .dxgi_format import (DXGI_FORMAT, DXGI_BYTE_PER_PIXEL,
+from .dxgi_format import (DXGI_FORMAT, DXGI_BYTE_PER_PIXEL, DXGI_BITS_PER_PIXEL, get_data_size,
                           FOURCC_TO_DXGI, BITMASK_TO_DXGI)
 from util import get_size, mkdir
 
@@ -27,7 +28,7 @@ class PF_FLAGS(IntEnum):
     BUMPDUDV = 0x00080000
 
 
-UNCANONICAL_FOURCC = [
+UNCANONICAL_FOURCC = frozenset([
     # fourCC for uncanonical formats (ETC, PVRTC, ATITC, ASTC)
     b"PTC2",
     b"PTC4",
@@ -41,7 +42,7 @@ UNCANONICAL_FOURCC = [
     b"AS85",
     b"AS86",
     b"AS:5"
-]
+])
 
 
 class DDSPixelFormat(c.LittleEndianStructure):
@@ -183,7 +184,7 @@ class DDS_CAPS2(IntEnum):
         return DDS_CAPS2.is_cube(caps2) and (caps2 != DDS_CAPS2.CUBEMAP_FULL)
 
 
-HDR_SUPPORTED = [
+HDR_SUPPORTED = frozenset([
     # Convertible as a decompressed format
     "BC6H_TYPELESS",
     "BC6H_UF16",
@@ -193,10 +194,10 @@ HDR_SUPPORTED = [
     "R32G32B32A32_FLOAT",
     "R16G16B16A16_FLOAT",
     "R32G32B32_FLOAT"
-]
+])
 
 
-TGA_SUPPORTED = [
+TGA_SUPPORTED = frozenset([
     # Convertible as a decompressed format
     "BC1_TYPELESS",
     "BC1_UNORM",
@@ -224,7 +225,7 @@ TGA_SUPPORTED = [
     "R8_UNORM",
     "A8_UNORM",
     "B5G5R5A1_UNORM"
-]
+])
 
 
 class DX10Header(c.LittleEndianStructure):
@@ -265,12 +266,16 @@ def convertible_to_hdr(name: str):
     return name in HDR_SUPPORTED
 
 
-def read_buffer(f: IOBase, size: int, end_offset: int):
+def check_buffer_size(f: IOBase, size: int, end_offset: int):
     if f.tell() + size > end_offset:
         raise RuntimeError(
             "There is no buffer that has specified size."
             f" (Offset: {f.tell()}, Size: {size})"
         )
+
+
+def read_buffer(f: IOBase, size: int, end_offset: int):
+    check_buffer_size(f, size, end_offset)
     return f.read(size)
 
 
@@ -442,7 +447,8 @@ class DDSHeader(c.LittleEndianStructure):
         slice_size = 0
         height, width = self.height, self.width
         block_size = self.get_block_size()
-        byte_per_pixel = self.get_bpp()
+        bits_per_pixel = DXGI_BITS_PER_PIXEL[self.dxgi_format]
+        bits, pixels = bits_per_pixel
 
         def cail(val, unit):
             remain = val % unit
@@ -457,15 +463,15 @@ class DDSHeader(c.LittleEndianStructure):
                 _height = cail(height, block_size)
 
             mipmap_size_list.append([_width, _height])
-            slice_size += _width * _height * byte_per_pixel
-            if slice_size != int(slice_size):
+            if (_width * _height * bits) % (pixels * 8):
                 raise RuntimeError(
                     "The size of mipmap data is not int. This is unexpected."
                 )
+            slice_size += get_data_size(_width * _height, bits_per_pixel)
             width, height = width // 2, height // 2
             width, height = max(block_size, width), max(block_size, height)
 
-        return mipmap_size_list, int(slice_size)
+        return mipmap_size_list, slice_size
 
     def print(self):
         print(f"  type: {self.get_texture_type()}")
@@ -496,8 +502,15 @@ class DDS:
         self.mipmap_size_list = mipmap_sizes
 
     @staticmethod
-    def load(file: str, verbose=False):
-        if file[-3:] not in ["dds", "DDS"]:
+    def load(file: str, verbose=False, header_only=False):
+        """Load a dds file.
+
+        Args:
+            file (str): path to dds
+            verbose (bool): show mipmap info or not
+            header_only (bool): skip texture data (DDS.slice_bin_list will be None)
+        """
+        if not file.lower().endswith(".dds"):
             raise RuntimeError(f"Not DDS. ({file})")
         print("load: " + file)
         with open(file, "rb") as f:
@@ -509,11 +522,18 @@ class DDS:
             mipmap_sizes, slice_size = header.get_size_list()
             num_slices = header.get_num_slices()
 
-            # read texture data
-            slices = []
-            for i in range(num_slices):
-                data = read_buffer(f, slice_size, end_offset)
-                slices.append(data)
+            if header_only:
+                # skip texture data but check the file size
+                check_buffer_size(f, slice_size * num_slices, end_offset)
+                f.seek(slice_size * num_slices, 1)
+                slices = None
+            else:
+                # read texture data with a single read call
+                data = read_buffer(f, slice_size * num_slices, end_offset)
+                if num_slices == 1:
+                    slices = [data]
+                else:
+                    slices = [data[i * slice_size: (i + 1) * slice_size] for i in range(num_slices)]
 
             dds = DDS(header, slices, mipmap_sizes)
             dds.print(verbose)
@@ -523,8 +543,14 @@ class DDS:
 
         return dds
 
+    def check_data(self):
+        """Raise an error if texture data was skipped with header_only=True."""
+        if self.slice_bin_list is None:
+            raise RuntimeError("DDS has no texture data. (It was loaded with header_only=True.)")
+
     # save as dds
     def save(self, file: str):
+        self.check_data()
         print("save: {}".format(file))
         folder = os.path.dirname(file)
         if folder not in [".", ""] and not os.path.exists(folder):
@@ -538,6 +564,13 @@ class DDS:
             for d in self.slice_bin_list:
                 f.write(d)
 
+    def to_bytes(self) -> bytes:
+        """Get binary data of the dds file."""
+        self.check_data()
+        with io.BytesIO() as f:
+            self.header.write(f)
+            return f.getvalue() + b"".join(self.slice_bin_list)
+
     def get_texture_type(self):
         return self.header.get_texture_type()
 
@@ -548,6 +581,7 @@ class DDS:
         return self.header.get_array_size()
 
     def get_disassembled_dds_list(self):
+        self.check_data()
         new_dds_num = self.header.depth * self.get_array_size()
         num_slices = 1 + (5 * self.is_cube())
         self.header.disassemble()
@@ -563,6 +597,8 @@ class DDS:
 
     @staticmethod
     def assemble(dds_list, is_array=True):
+        for dds in dds_list:
+            dds.check_data()
         header = dds_list[0].header
         header.assemble(is_array, len(dds_list))
         for dds in dds_list[1:]:
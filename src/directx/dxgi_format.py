@@ -7,6 +7,7 @@ Notes:
       https://github.com/microsoft/DirectXTex
 """
 from enum import IntEnum
+from fractions import Fraction
 
 
 class DXGI_FORMAT(IntEnum):
@@ -151,7 +152,7 @@ class DXGI_FORMAT(IntEnum):
 
     @classmethod
     def is_valid_format(cls, fmt_name):
-        return fmt_name in cls._member_names_
+        return fmt_name in cls.__members__
 
     @staticmethod
     def get_max_dx10():
@@ -343,6 +344,24 @@ DXGI_BYTE_PER_PIXEL = {
     DXGI_FORMAT.ETC2_RGBA: 1,
 }
 
+# Integer version of DXGI_BYTE_PER_PIXEL. (bits, pixels) means bits per pixels.
+# ASTC formats have fractional rates. (e.g. 128 bits per 36 pixels for 6x6 blocks)
+# The denominators are divisors of pixels in a block. So, they are 144 (12x12) or less.
+DXGI_BITS_PER_PIXEL = {
+    fmt: Fraction(bpp * 8).limit_denominator(144).as_integer_ratio() for fmt, bpp in DXGI_BYTE_PER_PIXEL.items()
+}
+
+
+def get_data_size(pixel_num: int, bits_per_pixel: tuple[int, int]) -> int:
+    """Get the size of pixel data in bytes with integer arithmetic.
+
+    Args:
+        pixel_num (int): number of pixels
+        bits_per_pixel (tuple[int, int]): a value of DXGI_BITS_PER_PIXEL
+    """
+    bits, pixels = bits_per_pixel
+    return (pixel_num * bits) // (pixels * 8)
+
 
 def int_to_byte(n):
     return n.to_bytes(1, byteorder="little")
@@ -8,12 +8,28 @@ import ctypes
 import os
 import shutil
 import tempfile
+import threading
 
 from .dds import DDS, DDSHeader, is_hdr
 from .dxgi_format import DXGI_FORMAT
 from util import mkdir, get_os_name, is_windows, is_mac, is_linux
 
 
+_local = threading.local()
+
+
+def get_texconv() -> "Texconv":
+    """Get a texture converter for the current thread.
+
+    Notes:
+        It will be reused by the following calls in the same thread.
+        So, the dll and COM will be initialized only once for each thread.
+    """
+    if getattr(_local, "texconv", None) is None:
+        _local.texconv = Texconv()
+    return _local.texconv
+
+
 class Texconv:
     """Texture converter."""
     def __init__(self, dll_path=None, com_initialized=False):
@@ -42,6 +58,8 @@ class Texconv:
 
         self.dll = ctypes.cdll.LoadLibrary(dll_path)
         self.com_initialized = com_initialized
+        # Buffer for error messages. It's reused for each call.
+        self.err_buf = ctypes.create_unicode_buffer(512)
 
     def convert_dds_to(self, file: str, out=None, fmt="tga",
                        cubemap_layout="h-cross", invert_normals=False, verbose=True):
@@ -109,13 +127,20 @@ class Texconv:
             name = ".".join(name.split(".")[:-1] + [fmt])
         return name
 
-    def convert_to_dds(self, file: str, dxgi_format: DXGI_FORMAT, out=None,
+    def convert_to_dds(self, file: str | list[str], dxgi_format: DXGI_FORMAT, out=None,
                        invert_normals=False, no_mip=False,
                        image_filter="LINEAR",
                        export_as_cubemap=False,
                        cubemap_layout="h-cross",
-                       verbose=True, allow_slow_codec=False):
-        """Convert texture to dds."""
+                       verbose=True, allow_slow_codec=False, gpu_index=0):
+        """Convert texture to dds.
+
+        Notes:
+            file can be a list of files to convert them with a texconv call.
+            It returns a list of the output paths then.
+            BC6 and BC7 will be compressed with DirectCompute on Windows.
+            gpu_index is the adapter used for it. CPU codec will be used when it's negative.
+        """
 
         dds_fmt = dxgi_format.name
 
@@ -132,8 +157,8 @@ class Texconv:
         if verbose:
             print(f"DXGI_FORMAT: {dds_fmt}")
 
-        base_name = os.path.basename(file)
-        base_name = ".".join(base_name.split(".")[:-1] + ["dds"])
+        files = file if isinstance(file, list) else [file]
+        base_names = [".".join(os.path.basename(f).split(".")[:-1] + ["dds"]) for f in files]
 
         args = ["-f", dds_fmt]
         if no_mip:
@@ -144,28 +169,42 @@ class Texconv:
         if ("BC5" in dds_fmt or dds_fmt == "R8G8_UNORM") and invert_normals:
             args += ["-inverty"]
 
+        if ("BC6" in dds_fmt or "BC7" in dds_fmt) and is_windows():
+            if gpu_index is None or gpu_index < 0:
+                args += ["-nogpu"]
+            else:
+                args += ["-gpu", str(gpu_index)]
+
         if export_as_cubemap:
+            if len(files) > 1:
+                raise RuntimeError("Can NOT convert multiple files to cubemaps at once.")
             if is_hdr(dds_fmt):
                 temp_args = ["-f", "fp32"]
             else:
                 temp_args = ["-f", "rgba"]
             with tempfile.TemporaryDirectory() as temp_dir:
-                temp = os.path.join(temp_dir, base_name)
-                self.__image_to_cube(file, temp, temp_args, cubemap_layout=cubemap_layout, verbose=verbose)
+                temp = os.path.join(temp_dir, base_names[0])
+                self.__image_to_cube(files[0], temp, temp_args, cubemap_layout=cubemap_layout, verbose=verbose)
                 out = self.__texconv(temp, args, out=out, verbose=verbose, allow_slow_codec=allow_slow_codec)
         else:
-            out = self.__texconv(file, args, out=out, verbose=verbose, allow_slow_codec=allow_slow_codec)
-        name = os.path.join(out, base_name)
-        return name
-
-    def convert_nondds(self, file: str, out=None, fmt="tga", verbose=True):
-        """Convert non-dds to non-dds."""
-        out = self.__texconv(file, ["-ft", fmt], out=out, verbose=verbose)
-        name = os.path.join(out, os.path.basename(file))
-        name = ".".join(name.split(".")[:-1] + [fmt])
-        return name
-
-    def __texconv(self, file: str, args: list[str],
+            out = self.__texconv(files, args, out=out, verbose=verbose, allow_slow_codec=allow_slow_codec)
+        names = [os.path.join(out, base_name) for base_name in base_names]
+        return names if isinstance(file, list) else names[0]
+
+    def convert_nondds(self, file: str | list[str], out=None, fmt="tga", verbose=True):
+        """Convert non-dds to non-dds.
+
+        Notes:
+            file can be a list of files to convert them with a texconv call.
+            It returns a list of the output paths then.
+        """
+        files = file if isinstance(file, list) else [file]
+        out = self.__texconv(files, ["-ft", fmt], out=out, verbose=verbose)
+        names = [os.path.join(out, os.path.basename(f)) for f in files]
+        names = [".".join(name.split(".")[:-1] + [fmt]) for name in names]
+        return names if isinstance(file, list) else names[0]
+
+    def __texconv(self, file: str | list[str], args: list[str],
                   out=None, verbose=True, allow_slow_codec=False):
         """Run texconv."""
         if out is not None and isinstance(out, str):
@@ -176,16 +215,17 @@ class Texconv:
         if out not in [".", ""] and not os.path.exists(out):
             mkdir(out)
 
-        args += ["-y", "--", os.path.normpath(file)]
+        files = file if isinstance(file, list) else [file]
+        args += ["-y", "--"] + [os.path.normpath(f) for f in files]
 
         args_p = [ctypes.c_wchar_p(arg) for arg in args]
         args_p = (ctypes.c_wchar_p*len(args_p))(*args_p)
-        err_buf = ctypes.create_unicode_buffer(512)
-        result = self.dll.texconv(len(args), args_p, verbose, not self.com_initialized, allow_slow_codec, err_buf, 512)
+        result = self.dll.texconv(len(args), args_p, verbose, not self.com_initialized, allow_slow_codec,
+                                  self.err_buf, len(self.err_buf))
         self.com_initialized = True
 
         if result != 0:
-            raise RuntimeError(err_buf.value)
+            raise RuntimeError(self.err_buf.value)
 
         return out
 
@@ -213,8 +253,8 @@ class Texconv:
 
         args_p = [ctypes.c_wchar_p(arg) for arg in args]
         args_p = (ctypes.c_wchar_p*len(args_p))(*args_p)
-        err_buf = ctypes.create_unicode_buffer(512)
-        result = self.dll.texassemble(len(args), args_p, verbose, not self.com_initialized, err_buf, 512)
+        result = self.dll.texassemble(len(args), args_p, verbose, not self.com_initialized,
+                                      self.err_buf, len(self.err_buf))
         self.com_initialized = True
         if result != 0:
-            raise RuntimeError(err_buf.value)
+            raise RuntimeError(self.err_buf.value)
@@ -4,23 +4,30 @@ import argparse
 import json
 import os
 import time
-from contextlib import redirect_stdout
+from contextlib import nullcontext, redirect_stdout
 import concurrent.futures
 import functools
+import hashlib
+import shutil
+import sys
+import threading
 
 # my scripts
-from util import (compare, get_ext, get_temp_dir,
-                  get_file_list, get_base_folder, remove_quotes,
+from util import (compare_binary, copy_file, get_ext, get_temp_dir, mkdir,
+                  get_file_list, get_base_folder, get_common_folder, remove_quotes,
                   check_python_version, is_windows)
 from unreal.uasset import Uasset, UASSET_EXT
+from unreal.file_summary import UassetFileSummary
+from unreal.version import VersionInfo
 from directx.dds import DDS
 from directx.dxgi_format import DXGI_FORMAT
-from directx.texconv import Texconv
 
 TOOL_VERSION = "0.6.1"
 
 # UE version: 4.0 ~ 5.4, ff7r, borderlands3
-UE_VERSIONS = ["4." + str(i) for i in range(28)] + ["5." + str(i) for i in range(5)] + ["ff7r", "borderlands3"]
+UE_VERSIONS = frozenset(
+    ["4." + str(i) for i in range(28)] + ["5." + str(i) for i in range(5)] + ["ff7r", "borderlands3"]
+)
 
 # UE version for textures
 UTEX_VERSIONS = [
@@ -37,12 +44,13 @@ if is_windows():
     TEXTURES += ["bmp", "jpg", "png"]
 
 # Supported image filters.
-IMAGE_FILTERS = ["point", "linear", "cubic"]
+IMAGE_FILTERS = frozenset(["point", "linear", "cubic"])
 
 
-def get_args():  # pragma: no cover
+def get_args(argv=None):  # pragma: no cover
+    """Parse command-line arguments. (sys.argv will be used when argv is None.)"""
     parser = argparse.ArgumentParser()
-    parser.add_argument("file", help="uasset, texture file, or folder")
+    parser.add_argument("file", help="uasset, texture file, or folder. '-' reads file paths from stdin.")
     parser.add_argument("texture", nargs="?", help="texture file for injection mode.")
     parser.add_argument("--save_folder", default="output", type=str, help="output folder")
     parser.add_argument("--mode", default="inject", type=str,
@@ -70,44 +78,82 @@ def get_args():  # pragma: no cover
     parser.add_argument("--max_workers", default=-1, type=int,
                         help=("The number of workers for multiprocessing."
                               " If -1, it will default to the number of processors on the machine."))
-    return parser.parse_args()
+    parser.add_argument("--gpu_index", default=0, type=int,
+                        help=("GPU adapter for BC6 and BC7 compression."
+                              " If -1, it will use CPU codec instead."))
+    parser.add_argument("--cache_folder", default=None, type=str,
+                        help=("folder to cache converted dds files for inject mode."
+                              " The same images won't be converted again."))
+    parser.add_argument("--cache_size", default=2.0, type=float,
+                        help="max size of the cache folder in GiB.")
+    return parser.parse_args(argv)
+
+
+# Loaded config.json. It'll be reused when main() is called many times in a process.
+_config = None
 
 
 def get_config():
-    json_path = os.path.join(os.path.dirname(__file__), "config.json")
-    if not os.path.exists(json_path):
-        return {}
-    with open(json_path, encoding="utf-8") as f:
-        return json.load(f)
+    global _config
+    if _config is None:
+        json_path = os.path.join(os.path.dirname(__file__), "config.json")
+        if not os.path.exists(json_path):
+            _config = {}
+        else:
+            with open(json_path, encoding="utf-8") as f:
+                _config = json.load(f)
+    return dict(_config)
 
 
 def save_config(config):
+    global _config
     json_path = os.path.join(os.path.dirname(__file__), "config.json")
     with open(json_path, "w", encoding="utf-8") as f:
         json.dump(config, f, indent=4, ensure_ascii=False)
+    _config = dict(config)
+
+
+class NullWriter:
+    """Text stream that discards outputs without any system calls."""
+    def write(self, s):
+        return len(s)
+
+    def flush(self):
+        pass
+
+
+NULL_STDOUT = NullWriter()
+
+
+def capture_stdout(func, *args, **kwargs):
+    """Call a function and return the outputs to stdout with the result.
+
+    Notes:
+        Errors are raised as is, with the outputs in error.stdout_output.
+        (It keeps the remote tracebacks of worker processes.)
+    """
+    from io import StringIO
+    default_stdout = sys.stdout
+    sys.stdout = StringIO()  # Store the outputs in a string
+    try:
+        return func(*args, **kwargs), sys.stdout.getvalue()[:-1]
+    except Exception as e:
+        e.stdout_output = sys.stdout.getvalue()[:-1]
+        raise
+    finally:
+        sys.stdout = default_stdout
 
 
 def stdout_wrapper(func):
     """Stdout wrapper to order the outputs in multiprocessing."""
     @functools.wraps(func)
     def caller(*args, **kwargs):
-        from io import StringIO
-        import sys
-        default_stdout = sys.stdout
-        sys.stdout = StringIO()  # Store the outputs in a string
-
-        def flush(stdout):
-            """Print outputs to the true stdout."""
-            stdout.seek(0)
-            print(stdout.read()[:-1], file=default_stdout, flush=True)
-            sys.stdout = default_stdout
-
         try:
-            response = func(*args, **kwargs)
+            response, output = capture_stdout(func, *args, **kwargs)
         except Exception as e:
-            flush(sys.stdout)  # Print outputs after execution
-            raise e
-        flush(sys.stdout)  # Print outputs after execution
+            print(e.stdout_output, flush=True)  # Print outputs before raising the error
+            raise
+        print(output, flush=True)  # Print outputs after execution
         return response
     return caller
 
@@ -117,42 +163,69 @@ def parse(folder, file, args, texture_file=None):
     """Parse mode (parse dds or uasset)"""
     file = os.path.join(folder, file)
     if get_ext(file) == "dds":
-        DDS.load(file, verbose=True)
+        DDS.load(file, verbose=True, header_only=True)
     else:
         Uasset(file, version=args.version, verbose=True)
 
 
 @stdout_wrapper
-def valid(folder, file, args, version=None, texture_file=None):
-    """Valid mode (check if the tool can read and write a file correctly.)"""
+def valid(folder, file, args, version=None, texture_file=None, binaries=None):
+    """Valid mode (check if the tool can read and write a file correctly.)
+
+    Notes:
+        binaries can be the data of the asset files. (It'll be used instead of reading the files again.)
+    """
     if version is None:
         version = args.version
 
-    with get_temp_dir(disable_tempfile=args.disable_tempfile) as temp_dir:
-        src_file = os.path.join(folder, file)
-        new_file = os.path.join(temp_dir, file)
-
-        if get_ext(file) == "dds":
-            # read and write dds
-            dds = DDS.load(src_file)
-            dds.save(new_file)
+    src_file = os.path.join(folder, file)
 
-            # compare files
-            compare(src_file, new_file)
+    if get_ext(file) == "dds":
+        # read and write dds in memory
+        dds = DDS.load(src_file)
+        # compare files
+        print(f"Comparing {src_file} and the serialized data...")
+        with open(src_file, "rb") as f:
+            compare_binary(f.read(), dds.to_bytes(), src_file)
 
-        else:
-            # read and write uasset
-            asset = Uasset(src_file, version=version, verbose=True)
-            old_name = asset.file_name
-            asset.save(new_file, valid=True)
-            new_name = asset.file_name
-            # compare files
-            for ext in UASSET_EXT:
-                if (os.path.exists(f"{old_name}.{ext}") and (asset.has_textures() or ext == "uasset")):
-                    compare(f"{old_name}.{ext}", f"{new_name}.{ext}")
-
-
-def search_texture_file(file_base, ext_list, index=None, index2=None):
+    else:
+        # read and write uasset in memory
+        if binaries is None:
+            binaries = Uasset.read_binaries(src_file)
+        asset = Uasset(src_file, version=version, verbose=True, binaries=binaries)
+        old_name = asset.file_name
+        new_binaries = asset.save_to_bytes(valid=True)
+        # compare files
+        for ext in UASSET_EXT:
+            old_file = f"{old_name}.{ext}"
+            if ext in binaries and (asset.has_textures() or ext == "uasset"):
+                print(f"Comparing {old_file} and the serialized data...")
+                compare_binary(binaries[ext], new_binaries.get(ext, b""), old_file)
+
+
+def texture_file_exists(file, dir_cache):
+    """Check if a file exists with a cached directory scan instead of stat calls.
+
+    Notes:
+        dir_cache is a dict for scanned folders. (folder path -> (file names, lowercase file names))
+        Make it for each task, so that it won't have old listings.
+        A name that only differs in case will be checked with a stat call.
+        (Case sensitivity depends on the volume, not on the OS.)
+    """
+    folder, name = os.path.split(file)
+    folder = folder or "."
+    if folder not in dir_cache:
+        if not os.path.isdir(folder):
+            return False
+        names = {entry.name for entry in os.scandir(folder) if entry.is_file()}
+        dir_cache[folder] = (names, {n.lower() for n in names})
+    names, lower_names = dir_cache[folder]
+    if name in names:
+        return True
+    return name.lower() in lower_names and os.path.isfile(file)
+
+
+def search_texture_file(file_base, ext_list, dir_cache, index=None, index2=None):
     """Sarch a texture file for injection mode."""
     if index is not None:
         file_base += index
@@ -161,14 +234,165 @@ def search_texture_file(file_base, ext_list, index=None, index2=None):
         if index2 is not None and ext != "dds":
             file += index2
         file = ".".join([file, ext])
-        if os.path.exists(file):
+        if texture_file_exists(file, dir_cache):
             return file
     raise RuntimeError(f"Texture file not found. ({file_base})")
 
 
+class ThreadLocalWriter:
+    """Text stream that sends outputs to a stream set for the current thread."""
+    def __init__(self, default_stdout):
+        self.default_stdout = default_stdout
+        self.local = threading.local()
+
+    def write(self, s):
+        return getattr(self.local, "stream", self.default_stdout).write(s)
+
+    def flush(self):
+        pass
+
+
+# Thread pool for map_textures. Threads are reused for all assets in a process.
+_texture_executor = None
+# Max number of threads for map_textures. Worker processes of run_tasks set it with init_worker.
+_texture_max_workers = None
+
+
+def init_worker(texture_max_workers):
+    """Initializer for worker processes of run_tasks.
+
+    Notes:
+        Assets are already processed in parallel with processes.
+        So, workers use fewer threads for textures to avoid running too many texconv calls at once.
+    """
+    global _texture_max_workers
+    _texture_max_workers = texture_max_workers
+
+
+def get_texture_max_workers(max_workers=None):
+    """Get the number of threads that map_textures will use."""
+    if _texture_max_workers is not None:
+        return _texture_max_workers
+    return get_max_workers(max_workers)
+
+
+def get_texture_executor(max_workers=None):
+    global _texture_executor
+    if _texture_executor is None:
+        _texture_executor = concurrent.futures.ThreadPoolExecutor(get_texture_max_workers(max_workers))
+    return _texture_executor
+
+
+def map_textures(func, textures, *iterables, max_workers=None):
+    """Call a function for each texture in an asset.
+
+    Notes:
+        Textures will be processed in parallel with threads.
+        It works because texconv releases the GIL while converting textures.
+        Outputs of each texture will be printed in order after all textures are processed.
+    """
+    if len(textures) <= 1 or get_texture_max_workers(max_workers) == 1:
+        return [func(*item) for item in zip(textures, *iterables)]
+
+    from io import StringIO
+    outputs = [StringIO() for _ in textures]
+    default_stdout = sys.stdout
+    writer = ThreadLocalWriter(default_stdout)
+
+    def call(output, *item):
+        writer.local.stream = output
+        try:
+            return func(*item)
+        finally:
+            del writer.local.stream
+
+    executor = get_texture_executor(max_workers)
+    sys.stdout = writer
+    try:
+        futures = [executor.submit(call, output, *item) for output, item in zip(outputs, zip(textures, *iterables))]
+        concurrent.futures.wait(futures)
+    finally:
+        sys.stdout = default_stdout
+        for output in outputs:
+            default_stdout.write(output.getvalue())
+    return [future.result() for future in futures]
+
+
+# Options of convert_to_dds that don't affect converted data. They won't be used for cache keys.
+DDS_CACHE_IGNORED_OPTIONS = frozenset(["verbose", "gpu_index", "allow_slow_codec"])
+
+
+def trim_dds_cache(cache_folder, max_size):
+    """Remove least recently used files until the cache gets smaller than max_size."""
+    if not os.path.isdir(cache_folder):
+        return
+    entries = []
+    for entry in os.scandir(cache_folder):
+        if entry.is_file() and entry.name.endswith(".dds"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue  # Other processes might remove it.
+        total_size -= size
+
+
+def get_dds_cache_file(file, dxgi_format, cache_folder, options):
+    """Get the path to a cached dds file for an image and conversion options."""
+    h = hashlib.blake2b()
+    with open(file, "rb") as f:
+        h.update(f.read())
+    options = sorted((k, v) for k, v in options.items() if k not in DDS_CACHE_IGNORED_OPTIONS)
+    h.update(repr((dxgi_format.name, options)).encode())
+    return os.path.join(cache_folder, h.hexdigest() + ".dds")
+
+
+def convert_to_dds_with_cache(texconv, file, dxgi_format, out=None, cache_folder=None, **kwargs):
+    """Convert an image (or a list of images) to dds. Results will be reused if cache_folder is specified.
+
+    Notes:
+        Cached files are identified by the source data and the conversion options.
+        Images that are not in the cache will be converted with a texconv call.
+        The cache folder won't be trimmed here. main() trims it once per run.
+    """
+    if cache_folder is None:
+        return texconv.convert_to_dds(file, dxgi_format, out=out, **kwargs)
+
+    files = file if isinstance(file, list) else [file]
+    cache_files = [get_dds_cache_file(f, dxgi_format, cache_folder, kwargs) for f in files]
+    dds_files = [None] * len(files)
+    for i, (f, cache_file) in enumerate(zip(files, cache_files)):
+        dds_file = os.path.join(out, os.path.splitext(os.path.basename(f))[0] + ".dds")
+        try:
+            mkdir(out)
+            copy_file(cache_file, dds_file)
+            os.utime(cache_file)  # Mark as recently used
+            dds_files[i] = dds_file
+        except FileNotFoundError:
+            pass  # Not cached yet, or removed by other processes
+
+    misses = [i for i, dds_file in enumerate(dds_files) if dds_file is None]
+    if len(misses) > 0:
+        converted = texconv.convert_to_dds([files[i] for i in misses], dxgi_format, out=out, **kwargs)
+        mkdir(cache_folder)
+        for i, dds_file in zip(misses, converted):
+            # Copy via a temp file so other processes won't read an incomplete file.
+            temp_file = f"{cache_files[i]}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.copyfile(dds_file, temp_file)
+            os.replace(temp_file, cache_files[i])
+            dds_files[i] = dds_file
+    return dds_files if isinstance(file, list) else dds_files[0]
+
+
 @stdout_wrapper
 def inject(folder, file, args, texture_file=None):
     """Inject mode (inject dds into the asset)"""
+    from directx.texconv import get_texconv  # Import it only in modes that use texconv
 
     # Read uasset
     uasset_file = os.path.join(folder, file)
@@ -193,6 +417,7 @@ def inject(folder, file, args, texture_file=None):
 
     textures = asset.get_texture_list()
     ext_list = [ext] + TEXTURES
+    dir_cache = {}  # Scanned texture folders
     if len(textures) == 1:
         if textures[0].is_empty():
             src_files = [None]
@@ -201,7 +426,7 @@ def inject(folder, file, args, texture_file=None):
             if len(splitted) >= 2 and splitted[-1] == "0":
                 file_base = "-".join(splitted[:-1])
             index2 = "-0" if textures[0].is_array or textures[0].is_3d else None
-            src_files = [search_texture_file(file_base, ext_list, index2=index2)]
+            src_files = [search_texture_file(file_base, ext_list, dir_cache, index2=index2)]
     else:
         # Find other files for multiple textures
         splitted = file_base.split(".")
@@ -213,60 +438,79 @@ def inject(folder, file, args, texture_file=None):
                 src_files.append(None)
             index = f".{i}"
             index2 = "-0" if tex.is_array or tex.is_3d else None
-            src_files.append(search_texture_file(file_base, ext_list, index=index, index2=index2))
-
-    if any([(src is not None) and (get_ext(src) != "dds") for src in src_files]):
-        texconv = Texconv()
+            src_files.append(search_texture_file(file_base, ext_list, dir_cache, index=index, index2=index2))
 
-    for tex, src in zip(textures, src_files):
+    # Update formats before injection. It edits the name map shared by textures.
+    src_is_dds = [src is not None and get_ext(src) == "dds" for src in src_files]
+    for tex, is_dds in zip(textures, src_is_dds):
         if tex.is_empty():
-            print("Skipped an empty texture.")
             continue
 
         if args.force_uncompressed:
             tex.to_uncompressed()
 
+        if not is_dds and tex.dxgi_format > DXGI_FORMAT.get_max_canonical():
+            print(f"Warning: DDS converter doesn't support {tex.dxgi_format.name}. "
+                  "The texture will use an uncompressed format.")
+            tex.to_uncompressed()
+
+    def inject_texture(tex, src, is_dds, index):
+        if tex.is_empty():
+            print("Skipped an empty texture.")
+            return
+
         # Get a image as a DDS object
-        if get_ext(src) == "dds":
+        if is_dds:
             dds = DDS.load(src)
         else:
-            if tex.dxgi_format > DXGI_FORMAT.get_max_canonical():
-                print(f"Warning: DDS converter doesn't support {tex.dxgi_format.name}. "
-                      "The texture will use an uncompressed format.")
-                tex.to_uncompressed()
-
-            with get_temp_dir(disable_tempfile=args.disable_tempfile) as temp_dir:
-                print(f"convert: {src}")
-                if tex.is_array or tex.is_3d:
-                    src_base, src_ext = os.path.splitext(src)
-                    src_base = src_base[:-2]
-                    i = 0
-                    dds_list = []
-                    while True:
-                        src = f"{src_base}-{i}{src_ext}"
-                        if not os.path.exists(src):
-                            break
-                        temp_dds = texconv.convert_to_dds(src, tex.dxgi_format,
-                                                          out=temp_dir, export_as_cubemap=tex.is_cube,
-                                                          no_mip=len(tex.mipmaps) <= 1 or args.no_mipmaps,
-                                                          image_filter=args.image_filter,
-                                                          allow_slow_codec=True, verbose=False)
-                        dds_list.append(DDS.load(temp_dds))
-                        i += 1
-                    dds = DDS.assemble(dds_list, is_array=tex.is_array)
-                else:
-                    temp_dds = texconv.convert_to_dds(src, tex.dxgi_format,
-                                                      out=temp_dir, export_as_cubemap=tex.is_cube,
-                                                      no_mip=len(tex.mipmaps) <= 1 or args.no_mipmaps,
-                                                      image_filter=args.image_filter,
-                                                      allow_slow_codec=True, verbose=False)
-                    dds = DDS.load(temp_dds)
+            # Texconv can't be shared between threads. (COM should be initialized for each thread.)
+            texconv = get_texconv()
+            # Each texture uses its own folder to avoid name collisions between threads.
+            temp_dir = os.path.join(asset_temp_dir, str(index))
+            print(f"convert: {src}")
+            if tex.is_array or tex.is_3d:
+                src_base, src_ext = os.path.splitext(src)
+                src_base = src_base[:-2]
+                src_list = []
+                while True:
+                    src = f"{src_base}-{len(src_list)}{src_ext}"
+                    if not texture_file_exists(src, dir_cache):
+                        break
+                    src_list.append(src)
+                # Convert all slices with a texconv call. (Cubemaps should be converted one by one.)
+                batches = [src_list] if src_list and not tex.is_cube else [[src] for src in src_list]
+                dds_list = []
+                for batch in batches:
+                    temp_dds_list = convert_to_dds_with_cache(texconv, batch, tex.dxgi_format,
+                                                              out=temp_dir, cache_folder=args.cache_folder,
+                                                              export_as_cubemap=tex.is_cube,
+                                                              no_mip=len(tex.mipmaps) <= 1 or args.no_mipmaps,
+                                                              image_filter=args.image_filter,
+                                                              allow_slow_codec=True, gpu_index=args.gpu_index,
+                                                              verbose=False)
+                    dds_list += [DDS.load(temp_dds) for temp_dds in temp_dds_list]
+                dds = DDS.assemble(dds_list, is_array=tex.is_array)
+            else:
+                temp_dds = convert_to_dds_with_cache(texconv, src, tex.dxgi_format,
+                                                     out=temp_dir, cache_folder=args.cache_folder,
+                                                     export_as_cubemap=tex.is_cube,
+                                                     no_mip=len(tex.mipmaps) <= 1 or args.no_mipmaps,
+                                                     image_filter=args.image_filter,
+                                                     allow_slow_codec=True, gpu_index=args.gpu_index,
+                                                     verbose=False)
+                dds = DDS.load(temp_dds)
 
         # inject the DDS
         tex.inject_dds(dds)
         if args.no_mipmaps:
             tex.remove_mipmaps()
 
+    # Use a temp folder for all textures in the asset
+    use_temp = not all(is_dds or tex.is_empty() for tex, is_dds in zip(textures, src_is_dds))
+    with get_temp_dir(disable_tempfile=args.disable_tempfile) if use_temp else nullcontext() as asset_temp_dir:
+        map_textures(inject_texture, textures, src_files, src_is_dds, range(len(textures)),
+                     max_workers=args.max_workers)
+
     # Write uasset
     asset.update_package_source(is_official=False)
     new_file = os.path.join(args.save_folder, file)
@@ -276,6 +520,7 @@ def inject(folder, file, args, texture_file=None):
 @stdout_wrapper
 def export(folder, file, args, texture_file=None):
     """Export mode (export uasset as dds)"""
+    from directx.texconv import get_texconv  # Import it only in modes that use texconv
     src_file = os.path.join(folder, file)
     new_file = os.path.join(args.save_folder, file)
     new_dir = os.path.dirname(new_file)
@@ -292,19 +537,18 @@ def export(folder, file, args, texture_file=None):
 
     textures = asset.get_texture_list()
     has_multi = len(textures) > 1
-    if args.export_as != "dds":
-        texconv = Texconv()
+    new_stem = os.path.splitext(new_file)[0]
 
-    for tex, i in zip(textures, range(len(textures))):
+    def export_texture(tex, i):
         if tex.is_empty():
             print("Skipped an empty texture.")
-            continue
+            return
 
         if has_multi:
             # Add indices for multiple textures
-            file_name = os.path.splitext(new_file)[0] + f".{i}.dds"
+            file_name = new_stem + f".{i}.dds"
         else:
-            file_name = os.path.splitext(new_file)[0] + ".dds"
+            file_name = new_stem + ".dds"
 
         if args.no_mipmaps:
             tex.remove_mipmaps()
@@ -312,18 +556,33 @@ def export(folder, file, args, texture_file=None):
         # Save texture
         dds = tex.get_dds()
         if args.export_as == "dds":
-            dds.save(file_name)
+            writes.append(writer.submit(dds.save, file_name))
         elif dds.header.dxgi_format > DXGI_FORMAT.get_max_canonical():
             print(f"Warning: DDS converter doesn't support {dds.header.dxgi_format.name}. "
                   "The texture will be exported as DDS.")
-            dds.save(file_name)
+            writes.append(writer.submit(dds.save, file_name))
         else:
             # Convert if the export format is not DDS
-            with get_temp_dir(disable_tempfile=args.disable_tempfile) as temp_dir:
-                temp_dds = os.path.join(temp_dir, os.path.basename(file_name))
-                dds.save(temp_dds)
-                converted_file = texconv.convert_dds_to(temp_dds, out=new_dir, fmt=args.export_as, verbose=False)
-                print(f"convert to: {converted_file}")
+            # Texconv can't be shared between threads. (COM should be initialized for each thread.)
+            texconv = get_texconv()
+            temp_dds = os.path.join(asset_temp_dir, os.path.basename(file_name))
+            dds.save(temp_dds)
+            converted_file = texconv.convert_dds_to(temp_dds, out=new_dir, fmt=args.export_as, verbose=False)
+            print(f"convert to: {converted_file}")
+
+    # DDS files are written in background threads while the next textures are decoded.
+    writes = []
+    if args.export_as == "dds":
+        temp_context = nullcontext()
+    else:
+        # Use a temp folder for all textures in the asset.
+        # The temporary dds files will be stored in RAM if possible.
+        data_size = sum(mip.get_data_size() for tex in textures for mip in tex.mipmaps)
+        temp_context = get_temp_dir(disable_tempfile=args.disable_tempfile, in_memory_size=data_size)
+    with temp_context as asset_temp_dir, concurrent.futures.ThreadPoolExecutor(2) as writer:
+        map_textures(export_texture, textures, range(len(textures)), max_workers=args.max_workers)
+    for future in writes:
+        future.result()  # Raise errors in writer threads
 
 
 @stdout_wrapper
@@ -359,15 +618,43 @@ def check_version(folder, file, args, texture_file=None):
     """Check mode (check file version)"""
 
     print("Running valid mode with each version...")
+
+    # Skip versions that can't have the same file version as the asset.
+    candidates = UTEX_VERSIONS
+    if get_ext(file) in UASSET_EXT:
+        file_version = Uasset.read_file_version(os.path.join(folder, file))
+        if file_version is not None:
+            candidates = [ver for ver in UTEX_VERSIONS
+                          if UassetFileSummary.get_file_version(VersionInfo(ver.split(" ~ ")[0])) == file_version]
+
+    # Read the files once for all versions.
+    binaries = None
+    if get_ext(file) in UASSET_EXT:
+        try:
+            binaries = Uasset.read_binaries(os.path.join(folder, file))
+        except OSError:
+            pass  # valid mode will raise errors for each version.
+
+    def try_valid(ver):
+        try:
+            valid.__wrapped__(folder, file, args, ver.split(" ~ ")[0], binaries=binaries)
+            return True
+        except Exception:
+            return False
+
+    # try to parse with null stdout
+    # (Versions are tried one by one. Threads won't help for python code, and stdout is shared by threads.)
+    with redirect_stdout(NULL_STDOUT):
+        results = {ver: try_valid(ver) for ver in candidates}
+
     passed_version = []
     for ver in UTEX_VERSIONS:
-        try:
-            # try to parse with null stdout
-            with redirect_stdout(open(os.devnull, "w")):
-                valid(folder, file, args, ver.split(" ~ ")[0])
+        if ver not in results:
+            print(f"  {(ver + ' ' * 11)[:11]}: Skipped (header mismatch)")
+        elif results[ver]:
             print(f"  {(ver + ' ' * 11)[:11]}: Passed")
             passed_version.append(ver)
-        except Exception:
+        else:
             print(f"  {(ver + ' ' * 11)[:11]}: Failed")
 
     # Show the result.
@@ -385,33 +672,35 @@ def check_version(folder, file, args, texture_file=None):
     return passed_version
 
 
+def get_convert_ext(args):
+    """Get file extension for convert mode."""
+    if args.convert_to.lower() in TEXTURES[1:]:
+        # not DDS
+        return args.convert_to.lower()
+    # a DXGI format (already validated by check_args)
+    return "dds"
+
+
 @stdout_wrapper
 def convert(folder, file, args, texture_file=None):
     """Convert mode (convert texture files)"""
+    from directx.texconv import get_texconv  # Import it only in modes that use texconv
     src_file = os.path.join(folder, file)
     new_file = os.path.join(args.save_folder, file)
-
-    if args.convert_to.lower() in TEXTURES[1:]:
-        # not DDS
-        ext = args.convert_to.lower()
-    else:
-        if not DXGI_FORMAT.is_valid_format(args.convert_to):
-            raise RuntimeError(f"The specified format is undefined. ({args.convert_to})")
-        # a DXGI format
-        ext = "dds"
-
+    ext = get_convert_ext(args)
     new_file = os.path.splitext(new_file)[0] + "." + ext
 
     print(f"Converting {src_file} to {new_file}...")
 
-    texconv = Texconv()
+    texconv = get_texconv()
     if ext == "dds":
         # image to dds
         texconv.convert_to_dds(src_file, DXGI_FORMAT[args.convert_to],
                                out=os.path.dirname(new_file), export_as_cubemap=False,
                                no_mip=args.no_mipmaps,
                                image_filter=args.image_filter,
-                               allow_slow_codec=True, verbose=False)
+                               allow_slow_codec=True, gpu_index=args.gpu_index,
+                               verbose=False)
     elif get_ext(file) == "dds":
         # dds to non-dds
         texconv.convert_dds_to(src_file, out=os.path.dirname(new_file), fmt=args.convert_to, verbose=False)
@@ -420,6 +709,120 @@ def convert(folder, file, args, texture_file=None):
         texconv.convert_nondds(src_file, out=os.path.dirname(new_file), fmt=args.convert_to, verbose=False)
 
 
+@stdout_wrapper
+def convert_files(folder, files, args, texture_file=None):
+    """Convert mode for multiple non-dds files in the same folder (convert them with a texconv call)"""
+    from directx.texconv import get_texconv  # Import it only in modes that use texconv
+    if len(files) == 1 or get_ext(files[0]) == "dds":
+        for file in files:
+            convert.__wrapped__(folder, file, args)
+        return
+
+    src_files = [os.path.join(folder, file) for file in files]
+    new_dir = os.path.dirname(os.path.join(args.save_folder, files[0]))
+    ext = get_convert_ext(args)
+
+    print(f"Converting {len(src_files)} files in {os.path.dirname(src_files[0])} to {ext}...")
+
+    texconv = get_texconv()
+    try:
+        if ext == "dds":
+            # images to dds
+            texconv.convert_to_dds(src_files, DXGI_FORMAT[args.convert_to],
+                                   out=new_dir, export_as_cubemap=False,
+                                   no_mip=args.no_mipmaps,
+                                   image_filter=args.image_filter,
+                                   allow_slow_codec=True, gpu_index=args.gpu_index,
+                                   verbose=False)
+        else:
+            # non-dds to non-dds
+            texconv.convert_nondds(src_files, out=new_dir, fmt=args.convert_to, verbose=False)
+    except Exception as e:
+        # Retry one by one to raise an error for the broken file
+        print(f"Failed to convert files at once. Retrying one by one... ({e})")
+        for file in files:
+            convert.__wrapped__(folder, file, args)
+
+
+def split_files_for_convert(file_list, max_workers=None):
+    """Split files into chunks for convert_files.
+
+    Notes:
+        Non-dds files in the same folder will be converted with a texconv call.
+        DDS files need some checks for each file. So, they won't be grouped.
+    """
+    chunks = []
+    groups = {}
+    for file in file_list:
+        if get_ext(file) == "dds":
+            chunks.append([file])
+        else:
+            groups.setdefault(os.path.dirname(file), []).append(file)
+
+    # Make a chunk for each worker
+    num_chunks = max_workers or os.cpu_count() or 1
+    for files in groups.values():
+        chunk_size = -(-len(files) // num_chunks)
+        chunks += [files[i: i + chunk_size] for i in range(0, len(files), chunk_size)]
+    return chunks
+
+
+def get_work_size(folder, file, file_sizes=None):
+    """Estimate the workload for a file (or a list of files) with file sizes.
+
+    Notes:
+        file_sizes is a dict of file sizes from get_file_list. (It should have all files in the folder.)
+        Sizes will be checked with stat calls when it's None.
+    """
+    if isinstance(file, list):
+        return sum(get_work_size(folder, f, file_sizes=file_sizes) for f in file)
+    if get_ext(file) == "uasset":
+        base = file[:-len("uasset")]
+        files = [base + ext for ext in UASSET_EXT]
+    else:
+        files = [file]
+    if file_sizes is not None:
+        return sum(file_sizes.get(f, 0) for f in files)
+    size = 0
+    for f in files:
+        try:
+            size += os.path.getsize(os.path.join(folder, f))
+        except OSError:
+            continue
+    return size
+
+
+def prefetch_files(folder, file):
+    """Ask the OS to read files for a task in advance, so that they are in cache when the task starts.
+
+    Notes:
+        It does nothing when os.posix_fadvise is not available. (e.g. Windows and macOS)
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    if isinstance(file, list):
+        for f in file:
+            prefetch_files(folder, f)
+        return
+    path = os.path.join(folder, file)
+    if get_ext(path) == "uasset":
+        base = path[:-len("uasset")]
+        paths = [base + ext for ext in UASSET_EXT]
+    else:
+        paths = [path]
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
 MODE_FUNCTIONS = {
     "valid": valid,
     "inject": inject,
@@ -446,6 +849,12 @@ def fix_args(args, config):
         with open(args.file, "r", encoding="utf-8") as f:
             args.file = remove_quotes(f.readline())
 
+    if args.file == "-":
+        # file paths from stdin. (e.g. find . -name "*.uasset" | python main.py - --mode=parse)
+        args.file_list = [remove_quotes(line.strip()) for line in sys.stdin if line.strip() != ""]
+    else:
+        args.file_list = None
+
     if args.mode == "check":
         if isinstance(args.version, str):
             args.version = [args.version]
@@ -460,13 +869,27 @@ def fix_args(args, config):
         args.export_as = "tga"
 
 
+def get_max_workers(max_workers=None):
+    """Get the number of workers that ProcessPoolExecutor will use."""
+    if max_workers is not None:
+        return max_workers
+    max_workers = os.cpu_count() or 1
+    if is_windows():
+        # ProcessPoolExecutor can't use more than 61 workers on Windows.
+        max_workers = min(max_workers, 61)
+    return max_workers
+
+
 def print_args(args):
     mode = args.mode
     print("-" * 16)
     print(f"Mode: {mode}")
     if mode != "check":
         print(f"UE version: {args.version}")
-    print(f"File: {args.file}")
+    if args.file == "-":
+        print(f"File: stdin ({len(args.file_list)} files)")
+    else:
+        print(f"File: {args.file}")
     if mode == "inject":
         print(f"Texture: {args.texture}")
     if mode not in ["check", "parse", "valid"]:
@@ -481,8 +904,12 @@ def print_args(args):
     if mode == "inject":
         print(f"Force uncompressed: {args.force_uncompressed}")
         print(f"Image filter: {args.image_filter}")
-    with concurrent.futures.ProcessPoolExecutor(args.max_workers) as executor:
-        print(f"Max workers: {executor._max_workers}")
+    if mode in ["inject", "convert"] and is_windows():
+        print(f"GPU index: {args.gpu_index}")
+    if mode == "inject" and args.cache_folder is not None:
+        print(f"Cache folder: {args.cache_folder}")
+        print(f"Cache size (GiB): {args.cache_size}")
+    print(f"Max workers: {get_max_workers(args.max_workers)}")
     print("-" * 16, flush=True)
 
 
@@ -492,7 +919,15 @@ def check_args(args):
         raise RuntimeError(f"Output path is not a folder. ({args.save_folder})")
     if args.file == "":
         raise RuntimeError("Specify a uasset file.")
-    if not os.path.exists(args.file):
+    if args.file == "-":
+        if mode == "inject":
+            raise RuntimeError("Inject mode can NOT read file paths from stdin.")
+        if len(args.file_list) == 0:
+            raise RuntimeError("No file paths in stdin.")
+        for file in args.file_list:
+            if not os.path.isfile(file):
+                raise RuntimeError(f"File not found. ({file})")
+    elif not os.path.exists(args.file):
         raise RuntimeError(f"Path not found. ({args.file})")
     if mode == "inject":
         if args.texture is None or args.texture == "":
@@ -514,6 +949,55 @@ def check_args(args):
         raise RuntimeError(f"Unsupported format to export. ({args.export_as})")
     if args.image_filter.lower() not in IMAGE_FILTERS:
         raise RuntimeError(f"Unsupported image filter. ({args.image_filter})")
+    if (mode == "convert" and args.convert_to.lower() not in TEXTURES[1:]
+            and not DXGI_FORMAT.is_valid_format(args.convert_to)):
+        raise RuntimeError(f"The specified format is undefined. ({args.convert_to})")
+
+
+def run_tasks(func, tasks, args, file_sizes=None):
+    """Call a mode function for each task. (folder, file, texture_file)
+
+    Notes:
+        Tasks will be processed in parallel with worker processes.
+        file_sizes is a dict of file sizes to estimate workloads. (See get_work_size.)
+    """
+    if len(tasks) <= 1 or args.max_workers == 1:
+        # No need to launch worker processes.
+        # But let the OS read the next files while processing the current one.
+        results = []
+        for i, (folder, file, texture) in enumerate(tasks):
+            if i + 1 < len(tasks):
+                prefetch_files(*tasks[i + 1][:2])
+            results.append(func(folder, file, args, texture_file=texture))
+        return results
+
+    # Submit large files first to balance the workload between workers. (LPT scheduling)
+    order = sorted(range(len(tasks)), key=lambda i: get_work_size(*tasks[i][:2], file_sizes=file_sizes),
+                   reverse=True)
+    # Share CPUs between worker processes for texture threads.
+    texture_max_workers = max(1, (os.cpu_count() or 1) // get_max_workers(args.max_workers))
+    with concurrent.futures.ProcessPoolExecutor(args.max_workers, initializer=init_worker,
+                                                initargs=(texture_max_workers,)) as executor:
+        futures = [None] * len(tasks)
+        for i in order:
+            folder, file, texture = tasks[i]
+            # Workers send outputs back with results. The main process prints them.
+            futures[i] = executor.submit(capture_stdout, func, folder, file, args, texture_file=texture)
+        not_done = futures
+        while not_done:
+            done, not_done = concurrent.futures.wait(not_done, return_when=concurrent.futures.FIRST_COMPLETED)
+            # Print outputs of finished tasks with a single write.
+            outputs = []
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    outputs.append(future.result()[1])
+                else:
+                    outputs.append(getattr(error, "stdout_output", ""))
+            print("\n".join(outputs), flush=True)
+
+    # future.result() raises errors with the tracebacks of worker processes.
+    return [future.result()[0] for future in futures]
 
 
 def main(args, config={}):
@@ -525,7 +1009,18 @@ def main(args, config={}):
 
     func = MODE_FUNCTIONS[mode]
 
-    if os.path.isfile(args.file):
+    if args.file == "-":
+        # args.file_list has file paths from stdin
+        # Keep relative paths from the common folder. Or files with the same name will overwrite each other.
+        folder = get_common_folder(args.file_list)
+        file_list = [os.path.relpath(os.path.abspath(file), folder) for file in args.file_list]
+        if mode not in ["parse", "valid", "check"]:
+            # Make output folders at once. Workers won't need to make them for each file.
+            for new_dir in {os.path.dirname(os.path.join(args.save_folder, file)) for file in file_list}:
+                mkdir(new_dir)
+        tasks = [(folder, file, None) for file in file_list]
+        results = run_tasks(func, tasks, args)
+    elif os.path.isfile(args.file):
         # args.file is a file
         file = args.file
         folder = os.path.dirname(file)
@@ -539,7 +1034,9 @@ def main(args, config={}):
             ext_list = ["uasset"]
 
         folder = args.file
-        file_list = get_file_list(folder, ext=ext_list)
+        # Get file sizes while scanning to estimate workloads without stat calls.
+        file_sizes = None if args.max_workers == 1 else {}
+        file_list = get_file_list(folder, ext=ext_list, file_sizes=file_sizes)
         texture_folder = args.texture
 
         if mode == "inject":
@@ -549,15 +1046,24 @@ def main(args, config={}):
 
         folder, base_folder = get_base_folder(folder)
         file_list = [os.path.join(base_folder, file) for file in file_list]
+        if file_sizes is not None:
+            file_sizes = {os.path.join(base_folder, file): size for file, size in file_sizes.items()}
+
+        if mode not in ["parse", "valid", "check"]:
+            # Make output folders at once. Workers won't need to make them for each file.
+            for new_dir in {os.path.dirname(os.path.join(args.save_folder, file)) for file in file_list}:
+                mkdir(new_dir)
+
+        if mode == "convert":
+            file_list = split_files_for_convert(file_list, max_workers=args.max_workers)
+            texture_file_list = [None] * len(file_list)
+            func = convert_files
+
+        tasks = [(folder, file, texture) for file, texture in zip(file_list, texture_file_list)]
+        results = run_tasks(func, tasks, args, file_sizes=file_sizes)
 
-        # multiprocessing
-        with concurrent.futures.ProcessPoolExecutor(args.max_workers) as executor:
-            futures = [
-                executor.submit(func, folder, file, args, texture_file=texture)
-                for file, texture in zip(file_list, texture_file_list)
-            ]
-            concurrent.futures.wait(futures)
-            results = [future.result() for future in futures]
+    if mode == "inject" and args.cache_folder is not None:
+        trim_dds_cache(args.cache_folder, int(args.cache_size * 1024 ** 3))
 
     if mode == "check" and args.save_detected_version:
         passed_versions = args.version
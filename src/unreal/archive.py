@@ -6,8 +6,11 @@ Notes:
     e.g. Ar << (type, obj, "attribute_name")
 """
 
-from io import IOBase, BytesIO
+from array import array
+import functools
+from io import IOBase
 import struct
+import sys
 
 
 def get_size(f: IOBase):
@@ -18,7 +21,23 @@ def get_size(f: IOBase):
     return size
 
 
+@functools.lru_cache(maxsize=None)
+def get_struct(fmt: str) -> struct.Struct:
+    """Get a compiled struct object.
+
+    Notes:
+        Results are cached because serializers use the same formats many times.
+    """
+    return struct.Struct(fmt)
+
+
 class ArchiveBase:
+    """Base class for archives.
+
+    Notes:
+        tell, seek, read, and write are the methods of io. They are bound in __init__.
+        (e.g. ar.read(size) is the same as ar.io.read(size))
+    """
     io: IOBase
     is_reading = False
     is_writing = False
@@ -31,12 +50,17 @@ class ArchiveBase:
 
         self.update_context(context)
 
-        if isinstance(io, BytesIO):
-            self.name = "BytesIO"
-        else:
-            self.name = io.name
+        # BytesIO and mmap objects don't have file names.
+        self.name = getattr(io, "name", type(io).__name__)
         self.args = None
 
+        # Bind the stream methods directly.
+        # Serializers call them for every field, and offsets are queried for every mipmap.
+        self.tell = io.tell
+        self.seek = io.seek
+        self.read = io.read
+        self.write = io.write
+
     def update_context(self, context: dict = {}):
         for key, val in context.items():
             setattr(self, key, val)
@@ -55,18 +79,6 @@ class ArchiveBase:
         """
         pass
 
-    def tell(self):
-        return self.io.tell()
-
-    def seek(self, val, mode=0):
-        self.io.seek(val, mode)
-
-    def read(self, size=-1):
-        return self.io.read(size)
-
-    def write(self, obj):
-        self.io.write(obj)
-
     def close(self):
         self.io.close()
 
@@ -107,6 +119,21 @@ class ArchiveBase:
     def is_eof(self):
         return self.tell() == self.size
 
+    def get_struct(self, fmt: str) -> struct.Struct:
+        """Get a compiled struct object for the byte order of the archive.
+
+        Args:
+            fmt (str): format for struct module without byte order (e.g. "qqI")
+        """
+        return get_struct(("<" if self.endian == "little" else ">") + fmt)
+
+    def serialize_fields(self, obj, fmt: str, names: tuple[str]):  # pragma: no cover
+        """Read or write consecutive fields at once.
+        Notes:
+            Ar.serialize_fields(obj, "iiq", ("attr1", "attr2", "attr3"))
+        """
+        pass
+
 
 class ArchiveRead(ArchiveBase):
     is_reading = True
@@ -119,14 +146,36 @@ class ArchiveRead(ArchiveBase):
         self.args = val[3:]
         offset = self.io.tell()
         actual = val[0].read(self)
-        expected = val[1]
+        self.check_const(actual, val[1], val[2], offset)
+
+    def check_const(self, actual, expected, name, offset):
+        """Raise an error if a constant value is unexpected."""
         if actual != expected:
             print(f"offset: {offset}")
             print(f"expected: {expected}")
             print(f"actual: {actual}")
-            msg = f"Unexpected value for {val[2]}."
+            msg = f"Unexpected value for {name}."
             raise RuntimeError(msg)
 
+    def read_structs(self, fmt: str, count: int) -> list[tuple]:
+        """Read an array of fixed-size structs at once.
+
+        Args:
+            fmt (str): format for struct module without byte order (e.g. "qqI")
+            count (int): number of structs
+
+        Returns:
+            list[tuple]: unpacked values for each struct
+        """
+        st = self.get_struct(fmt)
+        size = st.size * count
+        self.check_buffer_size(size)
+        return list(st.iter_unpack(self.read(size)))
+
+    def serialize_fields(self, obj, fmt: str, names: tuple[str]):
+        for name, val in zip(names, self.read_structs(fmt, 1)[0]):
+            setattr(obj, name, val)
+
 
 class ArchiveWrite(ArchiveBase):
     is_writing = True
@@ -139,6 +188,18 @@ class ArchiveWrite(ArchiveBase):
         self.args = val[3:]
         val[0].write(self, val[1])
 
+    def write_struct(self, fmt: str, *values):
+        """Write a fixed-size struct at once.
+
+        Args:
+            fmt (str): format for struct module without byte order (e.g. "qqI")
+            values: values to pack
+        """
+        self.write(self.get_struct(fmt).pack(*values))
+
+    def serialize_fields(self, obj, fmt: str, names: tuple[str]):
+        self.write_struct(fmt, *[getattr(obj, name) for name in names])
+
 
 class Bytes:
     @staticmethod
@@ -155,59 +216,78 @@ class Buffer(Bytes):
     @staticmethod
     def read(ar: ArchiveBase) -> bytes:
         size = ar.args[0]
-        ar.check_buffer_size(size)
-        return ar.read(size)
+        binary = ar.read(size)
+        # Check the length of the result instead of calling tell() before reading.
+        if len(binary) != size:
+            raise RuntimeError(
+                "There is no buffer that has specified size."
+                f" (Offset: {ar.tell() - len(binary)}, Size: {size})"
+            )
+        return binary
 
 
 class IntBase:
     size = 0
-    signed = False
+    fmt = ""
+    structs: dict[str, struct.Struct] = {}  # compiled structs for each byte order
+
+    def __init_subclass__(cls):
+        cls.structs = {"little": get_struct("<" + cls.fmt), "big": get_struct(">" + cls.fmt)}
 
     @classmethod
     def read(cls, ar: ArchiveBase) -> int:
         binary = ar.read(cls.size)
-        return int.from_bytes(binary, ar.endian, signed=cls.signed)
+        try:
+            return cls.structs[ar.endian].unpack(binary)[0]
+        except struct.error:
+            raise RuntimeError(
+                "There is no buffer that has specified size."
+                f" (Offset: {ar.tell() - len(binary)}, Size: {cls.size})"
+            )
 
     @classmethod
     def write(cls, ar: ArchiveBase, val: int):
-        binary = val.to_bytes(cls.size, byteorder=ar.endian, signed=cls.signed)
-        ar.write(binary)
+        ar.write(cls.structs[ar.endian].pack(val))
 
 
 class Uint8(IntBase):
     size = 1
+    fmt = "B"
 
 
 class Uint16(IntBase):
     size = 2
+    fmt = "H"
 
 
 class Uint32(IntBase):
     size = 4
+    fmt = "I"
 
 
 class Uint64(IntBase):
     size = 8
+    fmt = "Q"
 
 
 class Int8(IntBase):
     size = 1
-    signed = True
+    fmt = "b"
 
 
 class Int16(IntBase):
     size = 2
-    signed = True
+    fmt = "h"
 
 
 class Int32(IntBase):
     size = 4
-    signed = True
+    fmt = "i"
 
 
 class Int64(IntBase):
     size = 8
-    signed = True
+    fmt = "q"
 
 
 class NumArrayBase:
@@ -215,15 +295,22 @@ class NumArrayBase:
     elm_size = 0
 
     @classmethod
-    def read(cls, ar: ArchiveBase) -> list:
+    def read(cls, ar: ArchiveBase) -> array:
         size = ar.args[0]
-        binary = ar.read(cls.elm_size * size)
-        return list(struct.unpack(cls.elm_type * size, binary))
+        arr = array(cls.elm_type)
+        arr.frombytes(ar.read(cls.elm_size * size))
+        if ar.endian != sys.byteorder:
+            arr.byteswap()
+        return arr
 
     @classmethod
-    def write(cls, ar: ArchiveBase, val: list):
-        binary = struct.pack(cls.elm_type * len(val), *val)
-        ar.write(binary)
+    def write(cls, ar: ArchiveBase, val: array):
+        if ar.endian != sys.byteorder:
+            val = array(cls.elm_type, val)
+            val.byteswap()
+        elif not isinstance(val, array):
+            val = array(cls.elm_type, val)
+        ar.write(memoryview(val))
 
 
 class Uint32Array(NumArrayBase):
@@ -250,18 +337,28 @@ class String:
         else:
             encode = "ascii"
 
-        string = ar.read((num - 1) * (1 + utf16)).decode(encode)
-        ar.seek(1 + utf16, 1)
-        return string
+        # Read the string with its null terminator at once.
+        char_size = 1 + utf16
+        size = num * char_size
+        binary = ar.read(size)
+        if len(binary) != size:
+            raise RuntimeError(
+                "There is no buffer that has specified size."
+                f" (Offset: {ar.tell() - len(binary)}, Size: {size})"
+            )
+        return binary[:-char_size].decode(encode)
 
     @staticmethod
     def write(ar: ArchiveBase, val: str):
+        if val is None:
+            # Null string
+            ar.write(Int32.structs[ar.endian].pack(0))
+            return
         num = len(val) + 1
         utf16 = not val.isascii()
-        Int32.write(ar, num * (1 - 2 * utf16))
         encode = "utf-16-le" if utf16 else "ascii"
         str_byte = val.encode(encode)
-        ar.write(str_byte + b"\x00" * (1 + utf16))
+        ar.write(Int32.structs[ar.endian].pack(num * (1 - 2 * utf16)) + str_byte + b"\x00" * (1 + utf16))
 
 
 class StringWithLen:
@@ -285,6 +382,8 @@ class StringWithLen:
 
 
 class SerializableBase:
+    __slots__ = ()
+
     def serialize(self, ar: ArchiveBase):  # pragma: no cover
         pass
 
@@ -301,27 +400,23 @@ class SerializableBase:
 
 class StructArray:
 
-    @staticmethod
-    def read_obj(ar: ArchiveBase, cls, args: tuple):
-        ar.args = args
-        obj = cls.read(ar)
-        return obj
-
     @staticmethod
     def read(ar: ArchiveBase):
         cls = ar.args[0]
         size = ar.args[1]
         args = ar.args[2:]
-        objects = [StructArray.read_obj(ar, cls, args) for i in range(size)]
+        read = cls.read
+        objects = []
+        for i in range(size):
+            ar.args = args
+            objects.append(read(ar))
         return objects
 
-    @staticmethod
-    def write_obj(ar: ArchiveBase, obj, cls, args: tuple):
-        ar.args = args
-        cls.write(ar, obj)
-
     @staticmethod
     def write(ar: ArchiveBase, objects):
         cls = ar.args[0]
         args = ar.args[2:]
-        list(map(lambda obj: StructArray.write_obj(ar, obj, cls, args), objects))
+        write = cls.write
+        for obj in objects:
+            ar.args = args
+            write(ar, obj)
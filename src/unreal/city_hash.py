@@ -1,5 +1,6 @@
 # Converted UE4's codes (CityHash.cpp, etc.) to python.
 # https://github.com/EpicGames/UnrealEngine
+import struct
 
 # Bit mask to use uint64 and uint32 on python
 MASK_64 = 0xFFFFFFFFFFFFFFFF
@@ -10,19 +11,21 @@ k0 = 0xc3a5c85c97cb3127
 k1 = 0xb492b66fbe98f273
 k2 = 0x9ae16a3b2f90404f
 
-
-def to_uint(binary: bytes) -> int:
-    return int.from_bytes(binary, "little")
+# Compiled structs to load integers from bytes without slicing
+UINT64 = struct.Struct("<Q")
+UINT32 = struct.Struct("<I")
+UINT64_X4 = struct.Struct("<4Q")  # a 32-byte block
+UINT64_X8 = struct.Struct("<8Q")  # a 64-byte chunk
 
 
 # use char* as uint64 pointer
-def fetch64(binary: bytes) -> int:
-    return to_uint(binary[:8])
+def fetch64(binary: bytes, offset: int = 0) -> int:
+    return UINT64.unpack_from(binary, offset)[0]
 
 
 # use char* as uint32 pointer
-def fetch32(binary: bytes) -> int:
-    return to_uint(binary[:4])
+def fetch32(binary: bytes, offset: int = 0) -> int:
+    return UINT32.unpack_from(binary, offset)[0]
 
 
 def bswap_64(i: int) -> int:
@@ -60,14 +63,14 @@ def hash_len_0to16(binary: bytes) -> int:
     if length >= 8:
         mul = k2 + length * 2
         a = fetch64(binary) + k2
-        b = fetch64(binary[-8:])
+        b = fetch64(binary, length - 8)
         c = rotate(b, 37) * mul + a
         d = (rotate(a, 25) + b) * mul
         return hash_len_16(c, d, mul)
     if length >= 4:
         mul = k2 + length * 2
         a = fetch32(binary)
-        return hash_len_16(length + (a << 3), fetch32(binary[-4:]), mul)
+        return hash_len_16(length + (a << 3), fetch32(binary, length - 4), mul)
     if length > 0:
         a = binary[0]
         b = binary[length >> 1]
@@ -82,9 +85,9 @@ def hash_len_17to32(binary: bytes) -> int:
     length = len(binary)
     mul = k2 + length * 2
     a = fetch64(binary) * k1
-    b = fetch64(binary[8:])
-    c = fetch64(binary[-8:]) * mul
-    d = fetch64(binary[-16:]) * k2
+    b = fetch64(binary, 8)
+    c = fetch64(binary, length - 8) * mul
+    d = fetch64(binary, length - 16) * k2
     return (hash_len_16(
             rotate(a + b, 43) + rotate(c, 30) + d,
             a + rotate(b + k2, 18) + c,
@@ -96,13 +99,13 @@ def hash_len_33to64(binary: bytes) -> int:
     length = len(binary)
     mul = k2 + length * 2
     a = fetch64(binary) * k2
-    b = fetch64(binary[8:])
-    c = fetch64(binary[-24:])
-    d = fetch64(binary[-32:])
-    e = fetch64(binary[16:]) * k2
-    f = fetch64(binary[24:]) * 9
-    g = fetch64(binary[-8:])
-    h = fetch64(binary[-16:]) * mul
+    b = fetch64(binary, 8)
+    c = fetch64(binary, length - 24)
+    d = fetch64(binary, length - 32)
+    e = fetch64(binary, 16) * k2
+    f = fetch64(binary, 24) * 9
+    g = fetch64(binary, length - 8)
+    h = fetch64(binary, length - 16) * mul
     u = rotate(a + g, 43) + (rotate(b, 30) + c) * 9
     v = ((a + g) ^ d) + f + 1
     w = bswap_64((u + v) * mul) + h
@@ -114,14 +117,8 @@ def hash_len_33to64(binary: bytes) -> int:
     return (b + x) & MASK_64
 
 
-def weak_hash_len32_with_seeds(binary: bytes, a: int, b: int) -> int:
-    return weak_hash_len32_with_seeds2(
-        fetch64(binary),
-        fetch64(binary[8:]),
-        fetch64(binary[16:]),
-        fetch64(binary[24:]),
-        a,
-        b)
+def weak_hash_len32_with_seeds(binary: bytes, offset: int, a: int, b: int) -> int:
+    return weak_hash_len32_with_seeds2(*UINT64_X4.unpack_from(binary, offset), a, b)
 
 
 def weak_hash_len32_with_seeds2(w: int, x: int, y: int, z: int, a: int, b: int) -> int:
@@ -144,24 +141,25 @@ def city_hash_64(binary: bytes) -> int:
     elif length <= 64:
         return hash_len_33to64(binary)
 
-    x = fetch64(binary[-40:])
-    y = fetch64(binary[-16:]) + fetch64(binary[-56:])
-    z = hash_len_16_2(fetch64(binary[-48:]) + length, fetch64(binary[-24:]))
-    v_lo, v_hi = weak_hash_len32_with_seeds(binary[-64:], length, z)
-    w_lo, w_hi = weak_hash_len32_with_seeds(binary[-32:], y + k1, x)
+    x = fetch64(binary, length - 40)
+    y = fetch64(binary, length - 16) + fetch64(binary, length - 56)
+    z = hash_len_16_2(fetch64(binary, length - 48) + length, fetch64(binary, length - 24))
+    v_lo, v_hi = weak_hash_len32_with_seeds(binary, length - 64, length, z)
+    w_lo, w_hi = weak_hash_len32_with_seeds(binary, length - 32, y + k1, x)
     x = x * k1 + fetch64(binary)
-    length = (length - 1) & (~63)
-    binary = binary[:length]
-
-    while (len(binary) > 0):
-        x = rotate(x + y + v_lo + fetch64(binary[8:]), 37) * k1
-        y = rotate(y + v_hi + fetch64(binary[48:]), 42) * k1
+    end = (length - 1) & (~63)
+
+    # Process 64-byte chunks with an offset instead of slicing the input.
+    # Each chunk is loaded as 8 integers at once.
+    for pos in range(0, end, 64):
+        c0, c1, c2, c3, c4, c5, c6, c7 = UINT64_X8.unpack_from(binary, pos)
+        x = rotate(x + y + v_lo + c1, 37) * k1
+        y = rotate(y + v_hi + c6, 42) * k1
         x ^= w_hi
-        y += v_lo + fetch64(binary[40:])
+        y += v_lo + c5
         z = rotate(z + w_lo, 33) * k1
-        v_lo, v_hi = weak_hash_len32_with_seeds(binary, v_hi * k1, x + w_lo)
-        w_lo, w_hi = weak_hash_len32_with_seeds(binary[32:], z + w_hi, y + fetch64(binary[16:]))
+        v_lo, v_hi = weak_hash_len32_with_seeds2(c0, c1, c2, c3, v_hi * k1, x + w_lo)
+        w_lo, w_hi = weak_hash_len32_with_seeds2(c4, c5, c6, c7, z + w_hi, y + c2)
         z, x = x, z
-        binary = binary[64:]
     return hash_len_16_2(hash_len_16_2(v_lo, w_lo) + shift_mix(y) * k1 + z,
                          hash_len_16_2(v_hi, w_hi) + x)
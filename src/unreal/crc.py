@@ -60,8 +60,8 @@ def memcrc_deprecated(string):
     if string.isascii():
         ints = string.upper().encode("ascii")
     else:
-        binary = string.upper().encode("utf-16-le")
-        ints = struct.unpack("<"+"B"*len(string)*2, binary)
+        # bytes objects yield ints when iterated
+        ints = string.upper().encode("utf-16-le")
 
     # Generate hash from ints
     crc = 0
@@ -180,5 +180,5 @@ def strcrc(string):
     hash1 = memcrc_deprecated(string)
     hash2 = memcrc(string)
     hash_int = (hash1 & 0xFFFF) | ((hash2 & 0xFFFF) << 16)
-    hash_bin = struct.pack("<"+"I", hash_int)
+    hash_bin = hash_int.to_bytes(4, "little")
     return hash_bin
@@ -43,21 +43,23 @@ class DataResourceBase:
         self.has_64bit_size = False
 
     def unpack_bulk_flags(self, ar: ArchiveBase):
-        if self.bulk_flags & BulkDataFlags.BULKDATA_ForceInlinePayload > 0:
+        flags = self.bulk_flags
+        version = ar.version
+        if flags & BulkDataFlags.BULKDATA_ForceInlinePayload > 0:
             self.bulk_type = BulkType.UEXP
-        elif self.bulk_flags & BulkDataFlags.BULKDATA_Unused > 0:
+        elif flags & BulkDataFlags.BULKDATA_Unused > 0:
             self.bulk_type = BulkType.NONE
-        elif self.bulk_flags & BulkDataFlags.BULKDATA_OptionalPayload > 0:
+        elif flags & BulkDataFlags.BULKDATA_OptionalPayload > 0:
             self.bulk_type = BulkType.UPTNL
         else:
             self.bulk_type = BulkType.UBULK
-        if (ar.version == "ff7r") or (ar.version >= "4.26"):
-            self.has_wrong_offset = self.bulk_flags & BulkDataFlags.BULKDATA_NoOffsetFixUp == 0
+        if (version == "ff7r") or (version >= "4.26"):
+            self.has_wrong_offset = flags & BulkDataFlags.BULKDATA_NoOffsetFixUp == 0
         else:
-            if (self.bulk_flags & BulkDataFlags.BULKDATA_NoOffsetFixUp > 0) and ar.version <= "4.23":
-                raise RuntimeError(f"BULKDATA_UsesIODispatcher is not supported for this UE version. ({ar.version})")
+            if (flags & BulkDataFlags.BULKDATA_NoOffsetFixUp > 0) and version <= "4.23":
+                raise RuntimeError(f"BULKDATA_UsesIODispatcher is not supported for this UE version. ({version})")
             self.has_wrong_offset = True
-        self.has_64bit_size = self.bulk_flags & BulkDataFlags.BULKDATA_Size64Bit > 0
+        self.has_64bit_size = flags & BulkDataFlags.BULKDATA_Size64Bit > 0
 
     def update_bulk_flags(self, ar: ArchiveBase):
         # update bulk flags
@@ -69,12 +71,13 @@ class DataResourceBase:
             case BulkType.NONE:
                 self.bulk_flags = BulkDataFlags.BULKDATA_Unused
             case _:  # ubulk or uptnl
+                version = ar.version
                 self.bulk_flags = BulkDataFlags.BULKDATA_PayloadAtEndOfFile
-                if ar.version >= "4.14":
+                if version >= "4.14":
                     self.bulk_flags |= BulkDataFlags.BULKDATA_Force_NOT_InlinePayload
-                if ar.version >= "4.16":
+                if version >= "4.16":
                     self.bulk_flags |= BulkDataFlags.BULKDATA_PayloadInSeperateFile
-                if (ar.version == "ff7r") or (ar.version >= "4.26"):
+                if (version == "ff7r") or (version >= "4.26"):
                     self.bulk_flags |= BulkDataFlags.BULKDATA_NoOffsetFixUp
                 else:
                     self.has_wrong_offset = True
@@ -121,12 +124,17 @@ class LegacyDataResource(SerializableBase, DataResourceBase):
         if ar.is_writing:
             if not ar.valid:
                 self.update_bulk_flags(ar)
+            # bulk_flags, data_size, data_size2, offset
+            fmt = "Iqqq" if self.has_64bit_size else "Iiiq"
+            offset_to_offset = ar.tell() + ar.get_struct(fmt).size - 8
             if self.has_uexp_bulk() or self.has_no_bulk():
-                self.offset = ar.args[0]
+                self.offset = ar.args[0] + offset_to_offset + 8
+            self.offset_to_offset = offset_to_offset
+            ar.write_struct(fmt, self.bulk_flags, self.data_size, self.data_size, self.offset)
+            return
 
         ar << (Uint32, self, "bulk_flags")
-        if ar.is_reading:
-            self.unpack_bulk_flags(ar)
+        self.unpack_bulk_flags(ar)
 
         if self.has_64bit_size:
             int_type = Int64
@@ -135,10 +143,6 @@ class LegacyDataResource(SerializableBase, DataResourceBase):
         ar << (int_type, self, "data_size")  # ElementCount
         ar == (int_type, self.data_size, "data_size2")  # SizeOnDisk
 
-        if ar.is_writing:
-            if self.has_uexp_bulk() or self.has_no_bulk():
-                self.offset += ar.tell() + 8
-
         self.offset_to_offset = ar.tell()
         ar << (Int64, self, "offset")
 
@@ -171,6 +175,9 @@ class UassetDataResource(SerializableBase, DataResourceBase):
         if ar.is_writing:
             if not ar.valid:
                 self.update_bulk_flags(ar)
+            ar.write_struct(UassetDataResource.STRUCT_FORMAT, self.flags, self.offset, self.duplicated_offset,
+                            self.data_size, self.data_size, self.outer_index, self.bulk_flags)
+            return
 
         ar << (Uint32, self, "flags")
         ar << (Int64, self, "offset")
@@ -183,6 +190,34 @@ class UassetDataResource(SerializableBase, DataResourceBase):
         if ar.is_reading:
             self.unpack_bulk_flags(ar)
 
+    # flags, offset, duplicated_offset, data_size, data_size2, outer_index, bulk_flags
+    STRUCT_FORMAT = "IqqqqiI"
+
+    @staticmethod
+    def read_array(ar: ArchiveBase, count: int) -> list["UassetDataResource"]:
+        """Read data resources at once. It's faster than calling serialize() for each."""
+        data_resources = []
+        offset = ar.tell()
+        struct_size = ar.get_struct(UassetDataResource.STRUCT_FORMAT).size
+        for i, values in enumerate(ar.read_structs(UassetDataResource.STRUCT_FORMAT, count)):
+            obj = UassetDataResource()
+            obj.flags, obj.offset, obj.duplicated_offset, obj.data_size, data_size2, \
+                obj.outer_index, obj.bulk_flags = values
+            ar.check_const(data_size2, obj.data_size, "data_size2", offset + i * struct_size + 28)
+            obj.unpack_bulk_flags(ar)
+            data_resources.append(obj)
+        return data_resources
+
+    @staticmethod
+    def write_array(ar: ArchiveBase, data_resources: list["UassetDataResource"]):
+        """Write data resources at once."""
+        if not ar.valid:
+            for obj in data_resources:
+                obj.update_bulk_flags(ar)
+        pack = ar.get_struct(UassetDataResource.STRUCT_FORMAT).pack
+        ar.write(b"".join([pack(obj.flags, obj.offset, obj.duplicated_offset, obj.data_size,
+                                obj.data_size, obj.outer_index, obj.bulk_flags) for obj in data_resources]))
+
     def update(self, data_size: int, has_uexp_bulk: bool):
         super().update(data_size, has_uexp_bulk)
         self.has_64bit_size = True
@@ -214,6 +249,9 @@ class BulkDataMapEntry(SerializableBase, DataResourceBase):
         if ar.is_writing:
             if not ar.valid:
                 self.update_bulk_flags(ar)
+            ar.write_struct(BulkDataMapEntry.STRUCT_FORMAT, self.offset, self.duplicated_offset,
+                            self.data_size, self.bulk_flags, 0)
+            return
 
         ar << (Int64, self, "offset")
         ar << (Int64, self, "duplicated_offset")
@@ -224,6 +262,33 @@ class BulkDataMapEntry(SerializableBase, DataResourceBase):
         if ar.is_reading:
             self.unpack_bulk_flags(ar)
 
+    # offset, duplicated_offset, data_size, bulk_flags, pad
+    STRUCT_FORMAT = "qqqII"
+
+    @staticmethod
+    def read_array(ar: ArchiveBase, count: int) -> list["BulkDataMapEntry"]:
+        """Read data resources at once. It's faster than calling serialize() for each."""
+        data_resources = []
+        offset = ar.tell()
+        struct_size = ar.get_struct(BulkDataMapEntry.STRUCT_FORMAT).size
+        for i, values in enumerate(ar.read_structs(BulkDataMapEntry.STRUCT_FORMAT, count)):
+            obj = BulkDataMapEntry()
+            obj.offset, obj.duplicated_offset, obj.data_size, obj.bulk_flags, pad = values
+            ar.check_const(pad, 0, "pad", offset + i * struct_size + 28)
+            obj.unpack_bulk_flags(ar)
+            data_resources.append(obj)
+        return data_resources
+
+    @staticmethod
+    def write_array(ar: ArchiveBase, data_resources: list["BulkDataMapEntry"]):
+        """Write data resources at once."""
+        if not ar.valid:
+            for obj in data_resources:
+                obj.update_bulk_flags(ar)
+        pack = ar.get_struct(BulkDataMapEntry.STRUCT_FORMAT).pack
+        ar.write(b"".join([pack(obj.offset, obj.duplicated_offset, obj.data_size, obj.bulk_flags, 0)
+                           for obj in data_resources]))
+
     def update(self, data_size: int, has_uexp_bulk: bool):
         super().update(data_size, has_uexp_bulk)
         self.has_64bit_size = True
@@ -9,6 +9,7 @@ from .import_export import (NameBase, ImportBase, ExportBase,
                             UassetName, UassetImport, UassetExport,
                             ZenName, ZenImport, ZenExport)
 from .data_resource import DataResourceBase, UassetDataResource, BulkDataMapEntry
+from .version import VersionInfo
 
 
 class PackageFlags(IntEnum):
@@ -80,21 +81,7 @@ class UassetFileSummary(FileSummaryBase):
         super().serialize(ar)
 
         ar << (Bytes, self, "tag", 4)
-
-        """
-        File version
-        positive: 3.x
-        -3: 4.0 ~ 4.6
-        -5: 4.7 ~ 4.9
-        -6: 4.10 ~ 4.13
-        -7: 4.14 ~ 4.27
-        -8: 5.0 ~
-        """
-        expected_version = (
-            -8 + (ar.version <= "4.6") * 2 + (ar.version <= "4.9")
-            + (ar.version <= "4.13") + (ar.version <= "4.27")
-        )
-        ar == (Int32, expected_version, "header.file_version")
+        ar == (Int32, self.get_file_version(ar.version), "header.file_version")
 
         self.serialize_version_info(ar)
 
@@ -108,8 +95,7 @@ class UassetFileSummary(FileSummaryBase):
                      msg="Unsupported file format detected. (PKG_FilterEditorOnlyitorOnly is false.)")
 
         # Name table
-        ar << (Int32, self, "name_count")
-        ar << (Int32, self, "name_map_offset")
+        ar.serialize_fields(self, "ii", ("name_count", "name_map_offset"))
 
         if ar.version >= "5.1":
             # SoftObjectPaths
@@ -119,20 +105,13 @@ class UassetFileSummary(FileSummaryBase):
             ar << (Int32, self, "soft_object_offset")
 
         if ar.version >= "4.9":
-            # GatherableTextData
-            ar == (Int32, 0, "gatherable_text_count")
-            ar == (Int32, 0, "gatherable_text_offset")
-
-        # Exports
-        ar << (Int32, self, "export_count")
-        ar << (Int32, self, "export_offset")
-
-        # Imports
-        ar << (Int32, self, "import_count")
-        ar << (Int32, self, "import_offset")
+            # GatherableTextData (count and offset)
+            ar == (Buffer, b"\x00" * 8, "gatherable_text_data", 8)
 
-        # DependsOffset
-        ar << (Int32, self, "depends_offset")
+        # Exports, Imports, DependsOffset
+        ar.serialize_fields(self, "iiiii", ("export_count", "export_offset",
+                                            "import_count", "import_offset",
+                                            "depends_offset"))
 
         if ar.version >= "4.4" and ar.version <= "4.14":
             # StringAssetReferencesCount
@@ -141,12 +120,8 @@ class UassetFileSummary(FileSummaryBase):
                 self.string_asset_offset = self.asset_registry_data_offset
             ar << (Int32, self, "string_asset_offset")
         elif ar.version >= "4.15":
-            # SoftPackageReferencesCount
-            ar == (Int32, 0, "soft_package_count")
-            ar == (Int32, 0, "soft_package_offset")
-
-            # SearchableNamesOffset
-            ar == (Int32, 0, "searchable_name_offset")
+            # SoftPackageReferencesCount, SoftPackageReferencesOffset, SearchableNamesOffset
+            ar == (Buffer, b"\x00" * 12, "soft_package_and_searchable_names", 12)
 
         # ThumbnailTableOffset
         ar == (Int32, 0, "thumbnail_table_offset")
@@ -180,21 +155,17 @@ class UassetFileSummary(FileSummaryBase):
 
         if ar.version <= "4.13":
             ar == (Int32, 0, "num_texture_allocations")
-        ar << (Int32, self, "asset_registry_data_offset")
-        ar << (Int32, self, "bulk_offset")  # .uasset + .uexp - 4 (BulkDataStartOffset)
-
-        # WorldTileInfoDataOffset
-        ar == (Int32, 0, "world_tile_info_offset")
+        # AssetRegistryDataOffset, BulkDataStartOffset (.uasset + .uexp - 4)
+        ar.serialize_fields(self, "ii", ("asset_registry_data_offset", "bulk_offset"))
 
-        # ChunkIDs (zero length array), ChunkID
-        ar == (Int32Array, [0, 0], "ChunkID", 2)
+        # WorldTileInfoDataOffset, ChunkIDs (zero length array), ChunkID
+        ar == (Buffer, b"\x00" * 12, "world_tile_info_and_chunk_ids", 12)
 
         if ar.version <= "4.13":
             return
 
         # PreloadDependency
-        ar << (Int32, self, "preload_dependency_count")
-        ar << (Int32, self, "preload_dependency_offset")
+        ar.serialize_fields(self, "ii", ("preload_dependency_count", "preload_dependency_offset"))
 
         if ar.version <= "4.27":
             return
@@ -211,30 +182,46 @@ class UassetFileSummary(FileSummaryBase):
         # Location into the file of the data resource
         ar << (Int32, self, "data_resource_offset")
 
+    @staticmethod
+    def get_file_version(version: VersionInfo) -> int:
+        """
+        File version (LegacyFileVersion)
+        positive: 3.x
+        -3: 4.0 ~ 4.6
+        -5: 4.7 ~ 4.9
+        -6: 4.10 ~ 4.13
+        -7: 4.14 ~ 4.27
+        -8: 5.0 ~
+        """
+        return (
+            -8 + (version <= "4.6") * 2 + (version <= "4.9")
+            + (version <= "4.13") + (version <= "4.27")
+        )
+
     def serialize_name_map(self, ar: ArchiveBase, name_list: list[UassetName]) -> list[UassetName]:
         if ar.is_reading:
-            name_list = [UassetName() for i in range(self.name_count)]
-        else:
-            self.name_count = len(name_list)
-        list(map(lambda x: x.serialize(ar), name_list))
+            size = self.import_offset - ar.tell()
+            if size <= 0:
+                size = ar.size - ar.tell()
+            return UassetName.read_array(ar, self.name_count, size)
+        self.name_count = len(name_list)
+        UassetName.write_array(ar, name_list)
         return name_list
 
     def serialize_imports(self, ar: ArchiveBase, imports: list[UassetImport]) -> list[UassetImport]:
         ar.update_with_current_offset(self, "import_offset")
         if ar.is_reading:
-            imports = [UassetImport() for i in range(self.import_count)]
-        else:
-            self.import_count = len(imports)
-        list(map(lambda x: x.serialize(ar), imports))
+            return UassetImport.read_array(ar, self.import_count)
+        self.import_count = len(imports)
+        UassetImport.write_array(ar, imports)
         return imports
 
     def serialize_exports(self, ar: ArchiveBase, exports: list[UassetExport]) -> list[UassetExport]:
         ar.update_with_current_offset(self, "export_offset")
         if ar.is_reading:
-            exports = [UassetExport() for i in range(self.export_count)]
-        else:
-            self.export_count = len(exports)
-        list(map(lambda x: x.serialize(ar), exports))
+            return UassetExport.read_array(ar, self.export_count)
+        self.export_count = len(exports)
+        UassetExport.write_array(ar, exports)
         return exports
 
     def skip_exports(self, ar: ArchiveBase, count: int):
@@ -256,8 +243,8 @@ class UassetFileSummary(FileSummaryBase):
         ar << (Int32, self, "data_resource_count")
 
         if ar.is_reading:
-            data_resources = [UassetDataResource() for i in range(self.data_resource_count)]
-        list(map(lambda x: x.serialize(ar), data_resources))
+            return UassetDataResource.read_array(ar, self.data_resource_count)
+        UassetDataResource.write_array(ar, data_resources)
         return data_resources
 
     def print(self):
@@ -299,20 +286,17 @@ class ZenPackageSummary(FileSummaryBase):
     def serialize(self, ar: ArchiveBase):
         super().serialize(ar)
 
-        ar << (Uint32, self, "has_version_info")
-        ar << (Uint32, self, "uasset_size")
-        ar << (Uint32, self, "package_name_id")
-        ar << (Uint32, self, "package_name_number")
-        ar << (Uint32, self, "pkg_flags")
-        ar << (Uint32, self, "cooked_header_size")  # uasset_size when using UassetFileSummary
-        ar << (Int32, self, "export_hashes_offset")
-        ar << (Int32, self, "import_offset")
-        ar << (Int32, self, "export_offset")
-        ar << (Int32, self, "export_bundle_entries_offset")
+        # cooked_header_size is the same as uasset_size when using UassetFileSummary
+        ar.serialize_fields(self, "IIIIIIiiii", (
+            "has_version_info", "uasset_size", "package_name_id", "package_name_number",
+            "pkg_flags", "cooked_header_size", "export_hashes_offset", "import_offset",
+            "export_offset", "export_bundle_entries_offset"
+        ))
         if ar.version >= "5.3":
-            ar << (Int32, self, "dependency_bundle_headers_offset")
-            ar << (Int32, self, "dependency_bundle_entries_offset")
-            ar << (Int32, self, "imported_package_names_offset")
+            ar.serialize_fields(self, "iii", (
+                "dependency_bundle_headers_offset", "dependency_bundle_entries_offset",
+                "imported_package_names_offset"
+            ))
         else:
             ar << (Int32, self, "graph_data_offset")
         if self.has_version_info:
@@ -337,10 +321,9 @@ class ZenPackageSummary(FileSummaryBase):
         ar == (Uint64, 0xC1640000, "hash_version")
         if ar.is_reading:
             ar.check_buffer_size(self.name_map_size)
-            name_list = [ZenName() for i in range(self.name_count)]
-        list(map(lambda x: x.serialize_hash(ar), name_list))
-        list(map(lambda x: x.serialize_head(ar), name_list))
-        list(map(lambda x: x.serialize_string(ar), name_list))
+            name_list = ZenName.read_array(ar, self.name_count)
+        else:
+            ZenName.write_array(ar, name_list)
         if ar.version >= "5.4":
             if ar.is_writing and self.align_name_map:
                 self.pad_size = (8 - (ar.tell() % 8)) % 8
@@ -364,9 +347,9 @@ class ZenPackageSummary(FileSummaryBase):
         if ar.is_reading:
             ar.check_buffer_size(self.bulk_data_map_size)
             data_resource_count = self.bulk_data_map_size // struct_size
-            data_resources = [BulkDataMapEntry() for i in range(data_resource_count)]
+            return BulkDataMapEntry.read_array(ar, data_resource_count)
 
-        list(map(lambda x: x.serialize(ar), data_resources))
+        BulkDataMapEntry.write_array(ar, data_resources)
         return data_resources
 
     def serialize_export_hashes(self, ar: ArchiveBase):
@@ -379,8 +362,8 @@ class ZenPackageSummary(FileSummaryBase):
         if ar.is_reading:
             struct_size = ZenImport.get_struct_size(ar)
             import_count = (self.export_offset - self.import_offset) // struct_size
-            imports = [ZenImport() for i in range(import_count)]
-        list(map(lambda x: x.serialize(ar), imports))
+            return ZenImport.read_array(ar, import_count)
+        ZenImport.write_array(ar, imports)
         return imports
 
     def serialize_exports(self, ar: ArchiveBase, exports: list[ZenExport]) -> list[ZenExport]:
@@ -388,8 +371,8 @@ class ZenPackageSummary(FileSummaryBase):
         if ar.is_reading:
             struct_size = ZenExport.get_struct_size(ar)
             export_count = (self.export_bundle_entries_offset - self.export_offset) // struct_size
-            exports = [ZenExport() for i in range(export_count)]
-        list(map(lambda x: x.serialize(ar), exports))
+            return ZenExport.read_array(ar, export_count)
+        ZenExport.write_array(ar, exports)
         return exports
 
     def skip_exports(self, ar: ArchiveBase, count: int):
@@ -435,21 +418,13 @@ class ZenPackageSummary4(ZenPackageSummary):
     def serialize(self, ar: ArchiveBase):
         FileSummaryBase.serialize(self, ar)
 
-        ar << (Uint32, self, "name_id")
-        ar << (Uint32, self, "name_number")
-        ar << (Uint32, self, "source_name_id")
-        ar << (Uint32, self, "source_name_number")
-        ar << (Uint32, self, "pkg_flags")
-        ar << (Uint32, self, "cooked_header_size")  # uasset_size when using UassetFileSummary
-        ar << (Int32, self, "name_map_offset")
-        ar << (Int32, self, "name_map_size")
-        ar << (Int32, self, "name_hashes_offset")
-        ar << (Int32, self, "name_hashes_size")
-        ar << (Int32, self, "import_offset")
-        ar << (Int32, self, "export_offset")
-        ar << (Int32, self, "export_bundle_entries_offset")
-        ar << (Int32, self, "graph_data_offset")
-        ar << (Int32, self, "graph_data_size")
+        # cooked_header_size is the same as uasset_size when using UassetFileSummary
+        ar.serialize_fields(self, "IIIIIIiiiiiiiii", (
+            "name_id", "name_number", "source_name_id", "source_name_number",
+            "pkg_flags", "cooked_header_size", "name_map_offset", "name_map_size",
+            "name_hashes_offset", "name_hashes_size", "import_offset", "export_offset",
+            "export_bundle_entries_offset", "graph_data_offset", "graph_data_size"
+        ))
         ar == (Int32, 0, "pad")
         self.uasset_size = self.graph_data_offset + self.graph_data_size
 
@@ -469,16 +444,19 @@ class ZenPackageSummary4(ZenPackageSummary):
         if ar.is_reading:
             self.name_count = (self.name_hashes_size - 8) // 8
             ar.check_buffer_size(self.name_map_size)
-            name_list = [ZenName() for i in range(self.name_count)]
-
-        list(map(lambda x: x.serialize_head_and_string(ar), name_list))
+            name_list = ZenName.read_heads_and_strings(ar, self.name_count, self.name_map_size)
+        else:
+            ZenName.write_heads_and_strings(ar, name_list)
 
         ar.update_with_current_offset(self, "name_map_size", base=self.name_map_offset)
         ar.align(8)
 
         ar.update_with_current_offset(self, "name_hashes_offset")
         ar == (Uint64, 0xC1640000, "hash_version")
-        list(map(lambda x: x.serialize_hash(ar), name_list))
+        if ar.is_reading:
+            ZenName.read_hashes(ar, name_list)
+        else:
+            ZenName.write_hashes(ar, name_list)
 
         ar.update_with_current_offset(self, "name_hashes_size", base=self.name_hashes_offset)
         ar.check(self.name_hashes_size, len(name_list) * 8 + 8)
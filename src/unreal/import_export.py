@@ -5,7 +5,7 @@ from .version import VersionInfo
 from .archive import (ArchiveBase,
                       Uint8, Uint32, Uint64, Int32, Bytes,
                       String, StringWithLen,
-                      SerializableBase)
+                      SerializableBase, get_struct)
 
 
 class ObjectFlags(IntEnum):
@@ -17,6 +17,8 @@ class ObjectFlags(IntEnum):
 
 
 class NameBase(SerializableBase):
+    __slots__ = ("name", "hash")
+
     def __init__(self):
         self.hash = None
 
@@ -31,6 +33,8 @@ class NameBase(SerializableBase):
 
 
 class ImportBase(SerializableBase):
+    __slots__ = ("name", "class_name", "package_name")
+
     def serialize(self, ar: ArchiveBase):
         pass
 
@@ -42,10 +46,15 @@ class ImportBase(SerializableBase):
 
 
 class ExportBase(SerializableBase):
-    TEXTURE_CLASSES = [
+    __slots__ = (
+        "class_index", "super_index", "template_index", "outer_index",
+        "name_id", "name_number", "object_flags", "size", "offset",
+        "name", "class_name", "super_name", "template_name", "object", "meta_size"
+    )
+    TEXTURE_CLASSES = frozenset([
         "Texture2D", "TextureCube", "LightMapTexture2D", "ShadowMapTexture2D",
         "Texture2DArray", "TextureCubeArray", "VolumeTexture"
-    ]
+    ])
 
     def __init__(self):
         self.object = None  # The actual data will be stored here
@@ -80,12 +89,79 @@ class ExportBase(SerializableBase):
 
 
 class UassetName(NameBase):
+    __slots__ = ()
+
     def serialize(self, ar: ArchiveBase):
         ar << (String, self, "name")
         if ar.version <= "4.11":
             return
         ar << (Bytes, self, "hash", 4)
 
+    @staticmethod
+    def read_array(ar: ArchiveBase, count: int, size: int) -> list["UassetName"]:
+        """Read name map at once. It's faster than calling serialize() for each.
+
+        Args:
+            ar (ArchiveBase): archive for reading
+            count (int): number of names
+            size (int): max size of the name map
+        """
+        start = ar.tell()
+        buf = ar.read(size)
+        unpack_int = ar.get_struct("i").unpack_from
+        has_hash = not (ar.version <= "4.11")
+        name_list = []
+        offset = 0
+        for i in range(count):
+            if offset + 4 > len(buf):
+                raise RuntimeError(
+                    "There is no buffer that has specified size."
+                    f" (Offset: {start + offset}, Size: 4)"
+                )
+            num = unpack_int(buf, offset)[0]
+            offset += 4
+            name = UassetName()
+            if num == 0:
+                name.name = None
+            elif num > 0:
+                name.name = buf[offset: offset + num - 1].decode("ascii")
+                offset += num
+            else:
+                num = -num * 2
+                name.name = buf[offset: offset + num - 2].decode("utf-16-le")
+                offset += num
+            if has_hash:
+                name.hash = buf[offset: offset + 4]
+                offset += 4
+            name_list.append(name)
+        if offset > len(buf):
+            raise RuntimeError(
+                "There is no buffer that has specified size."
+                f" (Offset: {start}, Size: {offset})"
+            )
+        ar.seek(start + offset)
+        return name_list
+
+    @staticmethod
+    def write_array(ar: ArchiveBase, name_list: list["UassetName"]):
+        """Write name map at once."""
+        pack_int = ar.get_struct("i").pack
+        has_hash = not (ar.version <= "4.11")
+        chunks = []
+        for name in name_list:
+            string = name.name
+            if string is None:
+                chunks.append(pack_int(0))
+            elif string.isascii():
+                chunks.append(pack_int(len(string) + 1))
+                chunks.append(string.encode("ascii") + b"\x00")
+            else:
+                chunks.append(pack_int(-len(string) - 1))
+                chunks.append(string.encode("utf-16-le") + b"\x00\x00")
+            if has_hash:
+                chunks.append(name.hash)
+        ar.write(b"".join(chunks))
+
     def update(self, new_name, update_hash=False):
         self.name = new_name
         if update_hash:
@@ -98,6 +174,10 @@ class UassetImport(ImportBase):
     Notes:
         UnrealEngine/Engine/Source/Runtime/CoreUObject/Private/UObject/ObjectResource.cpp
     """
+    __slots__ = (
+        "class_package_name_id", "class_package_name_number", "class_name_id", "class_name_number",
+        "class_package_import_id", "name_id", "name_number", "optional"
+    )
 
     def serialize(self, ar: ArchiveBase):
         ar << (Int32, self, "class_package_name_id")
@@ -110,14 +190,47 @@ class UassetImport(ImportBase):
         if ar.version >= "5.0":
             ar << (Uint32, self, "optional")
 
+    @staticmethod
+    def get_struct_format(version: VersionInfo) -> str:
+        return "iiiiiiiI" if version >= "5.0" else "iiiiiii"
+
+    @staticmethod
+    def read_array(ar: ArchiveBase, count: int) -> list["UassetImport"]:
+        """Read imports at once. It's faster than calling serialize() for each."""
+        has_optional = ar.version >= "5.0"
+        imports = []
+        for values in ar.read_structs(UassetImport.get_struct_format(ar.version), count):
+            imp = UassetImport()
+            imp.class_package_name_id, imp.class_package_name_number, imp.class_name_id, imp.class_name_number, \
+                imp.class_package_import_id, imp.name_id, imp.name_number = values[:7]
+            if has_optional:
+                imp.optional = values[7]
+            imports.append(imp)
+        return imports
+
+    @staticmethod
+    def write_array(ar: ArchiveBase, imports: list["UassetImport"]):
+        """Write imports at once."""
+        st = ar.get_struct(UassetImport.get_struct_format(ar.version))
+        if ar.version >= "5.0":
+            ar.write(b"".join(st.pack(
+                imp.class_package_name_id, imp.class_package_name_number, imp.class_name_id, imp.class_name_number,
+                imp.class_package_import_id, imp.name_id, imp.name_number, imp.optional) for imp in imports))
+        else:
+            ar.write(b"".join(st.pack(
+                imp.class_package_name_id, imp.class_package_name_number, imp.class_name_id, imp.class_name_number,
+                imp.class_package_import_id, imp.name_id, imp.name_number) for imp in imports))
+
     def name_import(self, imports: list[ImportBase], name_list: list[NameBase]) -> str:
-        self.name = str(name_list[self.name_id])
+        name = str(name_list[self.name_id])
+        self.name = name
         self.class_name = str(name_list[self.class_name_id])
-        if self.class_package_import_id == 0:
+        package_import_id = self.class_package_import_id
+        if package_import_id == 0:
             self.package_name = "None"
         else:
-            self.package_name = name_list[imports[-self.class_package_import_id - 1].name_id]
-        return self.name
+            self.package_name = name_list[imports[-package_import_id - 1].name_id]
+        return name
 
     def print(self, padding=2):
         pad = " " * padding
@@ -132,6 +245,7 @@ class UassetExport(ExportBase):
     Notes:
         UnrealEngine/Engine/Source/Runtime/CoreUObject/Private/UObject/ObjectResource.cpp
     """
+    __slots__ = ("remainings",)
 
     def serialize(self, ar: ArchiveBase):
         ar << (Int32, self, "class_index")  # -: import id, +: export id
@@ -154,6 +268,41 @@ class UassetExport(ExportBase):
         remain_size = self.get_remainings_size(ar.version)
         ar << (Bytes, self, "remainings", remain_size)
 
+    @staticmethod
+    def get_struct_format(version: VersionInfo) -> str:
+        fmt = "iii" + "i" * (version >= "4.14") + "iiI" + ("I" if version <= "4.15" else "Q") + "I"
+        return fmt + f"{UassetExport.get_remainings_size(version)}s"
+
+    @staticmethod
+    def read_array(ar: ArchiveBase, count: int) -> list["UassetExport"]:
+        """Read exports at once. It's faster than calling serialize() for each."""
+        has_template = ar.version >= "4.14"
+        exports = []
+        for values in ar.read_structs(UassetExport.get_struct_format(ar.version), count):
+            exp = UassetExport()
+            if has_template:
+                exp.class_index, exp.super_index, exp.template_index, exp.outer_index, exp.name_id, \
+                    exp.name_number, exp.object_flags, exp.size, exp.offset, exp.remainings = values
+            else:
+                exp.class_index, exp.super_index, exp.outer_index, exp.name_id, \
+                    exp.name_number, exp.object_flags, exp.size, exp.offset, exp.remainings = values
+                exp.template_index = 0
+            exports.append(exp)
+        return exports
+
+    @staticmethod
+    def write_array(ar: ArchiveBase, exports: list["UassetExport"]):
+        """Write exports at once."""
+        st = ar.get_struct(UassetExport.get_struct_format(ar.version))
+        if ar.version >= "4.14":
+            ar.write(b"".join(st.pack(
+                exp.class_index, exp.super_index, exp.template_index, exp.outer_index, exp.name_id,
+                exp.name_number, exp.object_flags, exp.size, exp.offset, exp.remainings) for exp in exports))
+        else:
+            ar.write(b"".join(st.pack(
+                exp.class_index, exp.super_index, exp.outer_index, exp.name_id,
+                exp.name_number, exp.object_flags, exp.size, exp.offset, exp.remainings) for exp in exports))
+
     @staticmethod
     def get_remainings_size(version: VersionInfo) -> int:
         sizes = [
@@ -172,13 +321,8 @@ class UassetExport(ExportBase):
 
     @staticmethod
     def get_struct_size(version: VersionInfo):
-        meta_size = 32
-        if version >= "4.14":
-            meta_size += 4
-        if version >= "4.16":
-            meta_size += 4
-        meta_size += UassetExport.get_remainings_size(version)
-        return meta_size
+        # Standard sizes without alignment. (The size doesn't depend on byte order.)
+        return get_struct("<" + UassetExport.get_struct_format(version)).size
 
     def name_export(self, exports: list[ExportBase], imports: list[ImportBase], name_list: list[NameBase]):
         self.name = str(name_list[self.name_id])
@@ -210,6 +354,8 @@ class UassetExport(ExportBase):
 
 
 class ZenName(NameBase):
+    __slots__ = ("head",)
+
     def serialize_hash(self, ar: ArchiveBase):
         ar << (Uint64, self, "hash")
 
@@ -225,6 +371,89 @@ class ZenName(NameBase):
         self.serialize_head(ar)
         self.serialize_string(ar)
 
+    @staticmethod
+    def read_hashes(ar: ArchiveBase, name_list: list["ZenName"]):
+        """Read name hashes at once."""
+        for name, values in zip(name_list, ar.read_structs("Q", len(name_list))):
+            name.hash = values[0]
+
+    @staticmethod
+    def write_hashes(ar: ArchiveBase, name_list: list["ZenName"]):
+        """Write name hashes as a contiguous buffer."""
+        pack = ar.get_struct("Q").pack
+        ar.write(b"".join([pack(name.hash) for name in name_list]))
+
+    def encode(self) -> bytes:
+        return self.name.encode("ascii" if (self.head[0] & 0x80) == 0 else "utf-16-le")
+
+    @staticmethod
+    def write_heads_and_strings(ar: ArchiveBase, name_list: list["ZenName"]):
+        """Write name map of UE4 as a single buffer."""
+        ar.write(b"".join([name.head + name.encode() for name in name_list]))
+
+    @staticmethod
+    def write_array(ar: ArchiveBase, name_list: list["ZenName"]):
+        """Write name map of UE5 as a single buffer."""
+        ZenName.write_hashes(ar, name_list)
+        ar.write(b"".join([name.head for name in name_list] + [name.encode() for name in name_list]))
+
+    @staticmethod
+    def read_string(buf: bytes, offset: int, name: "ZenName") -> int:
+        """Decode a string with name.head from buf, and return the end offset."""
+        head = name.head
+        length = head[1] + ((head[0] & 0x7F) << 8)
+        if head[0] & 0x80:
+            end = offset + length * 2
+            name.name = buf[offset: end].decode("utf-16-le")
+        else:
+            end = offset + length
+            name.name = buf[offset: end].decode("ascii")
+        return end
+
+    @staticmethod
+    def read_heads_and_strings(ar: ArchiveBase, count: int, size: int) -> list["ZenName"]:
+        """Read name map of UE4 at once. Each string follows its header.
+
+        Args:
+            ar (ArchiveBase): archive for reading
+            count (int): number of names
+            size (int): size of the name map
+        """
+        start = ar.tell()
+        buf = ar.read(size)
+        name_list = []
+        offset = 0
+        for i in range(count):
+            name = ZenName()
+            name.head = buf[offset: offset + 2]
+            offset = ZenName.read_string(buf, offset + 2, name)
+            name_list.append(name)
+        if offset > len(buf):
+            raise RuntimeError(
+                "There is no buffer that has specified size."
+                f" (Offset: {start}, Size: {offset})"
+            )
+        ar.seek(start + offset)
+        return name_list
+
+    @staticmethod
+    def read_array(ar: ArchiveBase, count: int) -> list["ZenName"]:
+        """Read name map of UE5 at once. (hashes, headers, and then strings)"""
+        name_list = [ZenName() for i in range(count)]
+        ZenName.read_hashes(ar, name_list)
+        heads = ar.read(count * 2)
+        size = 0
+        for i, name in enumerate(name_list):
+            head = heads[i * 2: i * 2 + 2]
+            name.head = head
+            size += (head[1] + ((head[0] & 0x7F) << 8)) << (head[0] >> 7)
+        ar.check_buffer_size(size)
+        buf = ar.read(size)
+        offset = 0
+        for name in name_list:
+            offset = ZenName.read_string(buf, offset, name)
+        return name_list
+
     def update(self, new_name, update_hash=False):
         length = len(new_name)
         is_utf16 = not new_name.isascii()
@@ -274,16 +503,39 @@ class ZenImport(ImportBase):
     Notes:
         UnrealEngine/Engine/Source/Runtime/CoreUObject/Public/Serialization/AsyncLoading2.h
     """
+    __slots__ = ("type_and_id", "type", "id")
     INDEX_BITS = 62
     INDEX_MASK = (1 << INDEX_BITS) - 1
 
     def serialize(self, ar: ArchiveBase):
         if ar.is_writing:
-            self.type_and_id = self.type << ZenImport.INDEX_BITS | self.id
+            self.type_and_id = self.get_type_and_id()
         ar << (Uint64, self, "type_and_id")
         self.id = self.type_and_id & ZenImport.INDEX_MASK
         self.type = self.type_and_id >> ZenImport.INDEX_BITS
 
+    @staticmethod
+    def from_type_and_id(type_and_id: int) -> "ZenImport":
+        imp = ZenImport()
+        imp.type_and_id = type_and_id
+        imp.id = type_and_id & ZenImport.INDEX_MASK
+        imp.type = type_and_id >> ZenImport.INDEX_BITS
+        return imp
+
+    @staticmethod
+    def read_array(ar: ArchiveBase, count: int) -> list["ZenImport"]:
+        """Read imports at once. It's faster than calling serialize() for each."""
+        return [ZenImport.from_type_and_id(values[0]) for values in ar.read_structs("Q", count)]
+
+    def get_type_and_id(self) -> int:
+        return self.type << ZenImport.INDEX_BITS | self.id
+
+    @staticmethod
+    def write_array(ar: ArchiveBase, imports: list["ZenImport"]):
+        """Write imports at once."""
+        pack = ar.get_struct("Q").pack
+        ar.write(b"".join(pack(imp.get_type_and_id()) for imp in imports))
+
     def name_import(self, imports: list[ImportBase], name_list: list[ZenName]) -> str:
         if self.is_invalid():
             self.name = "Invalid"
@@ -340,6 +592,7 @@ class ZenExport(ExportBase):
     Notes:
         UnrealEngine/Engine/Source/Runtime/CoreUObject/Public/Serialization/AsyncLoading2.h
     """
+    __slots__ = ("public_export_hash", "filter_flags")
 
     def serialize(self, ar: ArchiveBase):
         ar << (Uint64, self, "offset")
@@ -355,6 +608,39 @@ class ZenExport(ExportBase):
         ar << (Uint8, self, "filter_flags")
         ar == (Bytes, b"\x00\x00\x00", "pad", 3)
 
+    # offset, size, name_id, name_number, outer_index, class_index, super_index, template_index,
+    # public_export_hash, object_flags, filter_flags, pad
+    STRUCT_FORMAT = "QQIIQQQQQIB3s"
+
+    @staticmethod
+    def read_array(ar: ArchiveBase, count: int) -> list["ZenExport"]:
+        """Read exports at once. It's faster than calling serialize() for each."""
+        exports = []
+        offset = ar.tell()
+        struct_size = ZenExport.get_struct_size(ar.version)
+        from_type_and_id = ZenImport.from_type_and_id
+        for i, values in enumerate(ar.read_structs(ZenExport.STRUCT_FORMAT, count)):
+            exp = ZenExport()
+            exp.offset, exp.size, exp.name_id, exp.name_number, outer_index, class_index, super_index, \
+                template_index, exp.public_export_hash, exp.object_flags, exp.filter_flags, pad = values
+            exp.outer_index = from_type_and_id(outer_index)
+            exp.class_index = from_type_and_id(class_index)
+            exp.super_index = from_type_and_id(super_index)
+            exp.template_index = from_type_and_id(template_index)
+            ar.check_const(pad, b"\x00\x00\x00", "pad", offset + i * struct_size + 69)
+            exports.append(exp)
+        return exports
+
+    @staticmethod
+    def write_array(ar: ArchiveBase, exports: list["ZenExport"]):
+        """Write exports at once."""
+        pack = ar.get_struct(ZenExport.STRUCT_FORMAT).pack
+        ar.write(b"".join(pack(
+            exp.offset, exp.size, exp.name_id, exp.name_number,
+            exp.outer_index.get_type_and_id(), exp.class_index.get_type_and_id(),
+            exp.super_index.get_type_and_id(), exp.template_index.get_type_and_id(),
+            exp.public_export_hash, exp.object_flags, exp.filter_flags, b"\x00\x00\x00") for exp in exports))
+
     def name_export(self, exports: list[ExportBase], imports: list[ZenImport], name_list: list[ZenName]):
         self.name = str(name_list[self.name_id])
 
@@ -1,9 +1,10 @@
 """Classes for .uasset"""
 import io
 from io import IOBase
+import mmap
 import os
 
-from util import mkdir
+from util import mkdir, get_ext
 from .import_export import ExportBase
 from .utexture import Utexture
 from .version import VersionInfo
@@ -15,6 +16,9 @@ from .file_summary import (UassetFileSummary, ZenPackageSummary, ZenPackageSumma
 
 UASSET_EXT = ["uasset", "uexp", "ubulk", "uptnl"]
 
+# Versions whose DependsOffset is kept as it is when saving
+NO_DEPENDS_VERSIONS = frozenset(["4.14", "4.15"])
+
 
 class Uunknown(SerializableBase):
     """Unknown Uobject."""
@@ -34,7 +38,7 @@ class Uasset:
     TAG_SWAPPED = b"\x9E\x2A\x83\xC1"  # for big endian files
     TAG_UCAS = b"\x00\x00\x00\x00"  # ucas assets don't have tag and file version.
 
-    def __init__(self, file_path: str, version: str = "ff7r", verbose=False):
+    def __init__(self, file_path: str, version: str = "ff7r", verbose=False, binaries: dict[str, bytes] = None):
         if not os.path.isfile(file_path):
             raise RuntimeError(f"Not File. ({file_path})")
 
@@ -43,6 +47,8 @@ class Uasset:
         self.exports = None
         self.data_resources = []
         self.texture = None
+        self.memory_files = None  # Used to store serialized files in memory
+        self.source_binaries = binaries  # Used to read files from memory (e.g. {"uasset": ..., "uexp": ...})
         self.io_dict = {}
         self.bin_dict = {}
         for k in UASSET_EXT[1:]:
@@ -60,11 +66,54 @@ class Uasset:
         self.context_valid = False
         self.is_ucas = False
         self.has_end_tag = True
-        ar = ArchiveRead(open(uasset_file, "rb"), context=self.get_ar_context())
+        if binaries is not None and "uasset" in binaries:
+            uasset_bin = binaries["uasset"]
+        else:
+            with open(uasset_file, "rb") as f:
+                uasset_bin = f.read()
+        ar = ArchiveRead(io.BytesIO(uasset_bin), context=self.get_ar_context())
         self.serialize(ar)
         ar.close()
+        self.header.file_name = uasset_file
         self.read_export_objects(verbose=verbose)
 
+    @staticmethod
+    def read_binaries(file_path: str) -> dict[str, bytes]:
+        """Read all files of an asset.
+
+        Returns:
+            dict[str, bytes]: binary data for each file extension (e.g. {"uasset": ..., "uexp": ...})
+        """
+        file_name = os.path.splitext(file_path)[0]
+        binaries = {}
+        for ext in UASSET_EXT:
+            try:
+                with open(f"{file_name}.{ext}", "rb") as f:
+                    binaries[ext] = f.read()
+            except FileNotFoundError:
+                continue
+        return binaries
+
+    @staticmethod
+    def read_file_version(file_path: str) -> int:
+        """Read LegacyFileVersion from the header without parsing the whole file.
+
+        Returns:
+            int: File version. None for ucas assets and unknown files.
+        """
+        uasset_file = os.path.splitext(file_path)[0] + ".uasset"
+        with open(uasset_file, "rb") as f:
+            binary = f.read(8)
+        if len(binary) < 8:
+            return None
+        if binary.startswith(Uasset.TAG):
+            endian = "little"
+        elif binary.startswith(Uasset.TAG_SWAPPED):
+            endian = "big"
+        else:
+            return None
+        return int.from_bytes(binary[4:], endian, signed=True)
+
     def get_ar_context(self):
         context = {
             "version": self.version,
@@ -109,24 +158,30 @@ class Uasset:
         # read imports
         self.imports = self.header.serialize_imports(ar, self.imports)
         if ar.is_reading:
-            list(map(lambda x: x.name_import(self.imports, self.name_list), self.imports))
+            imports, name_list = self.imports, self.name_list
+            for imp in imports:
+                imp.name_import(imports, name_list)
             if ar.verbose:
                 print("Imports")
-                list(map(lambda x: x.print(), self.imports))
+                for imp in self.imports:
+                    imp.print()
 
         if ar.is_reading:
             # read exports
             self.exports = self.header.serialize_exports(ar, self.exports)
-            list(map(lambda x: x.name_export(self.exports, self.imports, self.name_list), self.exports))
+            exports, imports, name_list = self.exports, self.imports, self.name_list
+            for exp in exports:
+                exp.name_export(exports, imports, name_list)
             if ar.verbose:
                 print("Exports")
-                list(map(lambda x: x.print(), self.exports))
+                for exp in self.exports:
+                    exp.print()
                 print(f"Main Export Class: {self.get_main_class_name()}")
         else:
             # skip exports part
             self.header.export_offset = ar.tell()
             self.header.skip_exports(ar, len(self.exports))
-            if self.version not in ["4.15", "4.14"]:
+            if self.version.base not in NO_DEPENDS_VERSIONS:
                 self.header.depends_offset = ar.tell()
 
         if ar.is_ucas:
@@ -160,7 +215,6 @@ class Uasset:
         else:
             self.header.uasset_size = ar.tell()
             self.header.bulk_offset = self.uexp_size + self.header.uasset_size
-            self.header.name_count = len(self.name_list)
             # write header
             ar.seek(0)
             ar << (UassetFileSummary, self, "header")
@@ -225,11 +279,12 @@ class Uasset:
         if self.has_textures():
             self.data_resources.clear()
         uexp_io = self.get_io(ext="uexp", rb=False)
+        offset = uexp_io.tell()
         for exp in self.exports:
             exp.object.serialize(uexp_io)
             offset = uexp_io.tell()
             exp.update(exp.object.uexp_size, offset)
-        self.uexp_size = uexp_io.tell()
+        self.uexp_size = offset
         for exp in self.exports:
             if exp.is_texture():
                 exp.object.rewrite_offset_data()
@@ -247,15 +302,31 @@ class Uasset:
         uasset_file = self.file_name + ".uasset"
         print("save :" + uasset_file)
 
-        self.context_verbose = False
-        self.context_valid = valid
-        self.write_export_objects()
+        # Serialize all files in memory, then write each of them at once.
+        memory_files = self.save_to_bytes(valid=valid)
+        for ext, binary in memory_files.items():
+            with open(f"{self.file_name}.{ext}", "wb") as f:
+                f.write(binary)
 
-        ar = ArchiveWrite(open(uasset_file, "wb"), context=self.get_ar_context())
-
-        self.serialize(ar)
+    def save_to_bytes(self, valid=False) -> dict[str, bytes]:
+        """Serialize the asset in memory without writing files.
 
-        ar.close()
+        Returns:
+            dict[str, bytes]: binary data for each file extension (e.g. {"uasset": ..., "uexp": ...})
+        """
+        self.context_verbose = False
+        self.context_valid = valid
+        self.memory_files = {}
+        try:
+            self.write_export_objects()
+            ar = ArchiveWrite(io.BytesIO(), context=self.get_ar_context())
+            ar.name = self.file_name + ".uasset"
+            self.serialize(ar)
+            self.memory_files["uasset"] = ar.io.getvalue()
+            ar.close()
+            return self.memory_files
+        finally:
+            self.memory_files = None
 
     def update_name_list(self, i: int, new_name: str):
         name = self.name_list[i]
@@ -271,13 +342,15 @@ class Uasset:
         self.header.inc_file_size(diff)
 
     def get_main_export(self) -> ExportBase:
-        main_list = [exp for exp in self.exports if (exp.is_public() and not exp.is_base())]
-        standalone_list = [exp for exp in main_list if exp.is_standalone()]
-        if len(standalone_list) > 0:
-            return standalone_list[0]
-        if len(main_list) > 0:
-            return main_list[0]
-        return None
+        # The first standalone export is preferred over the first public one.
+        main_obj = None
+        for exp in self.exports:
+            if exp.is_public() and not exp.is_base():
+                if exp.is_standalone():
+                    return exp
+                if main_obj is None:
+                    main_obj = exp
+        return main_obj
 
     def get_main_class_name(self):
         main_obj = self.get_main_export()
@@ -308,16 +381,35 @@ class Uasset:
                 textures.append(exp.object)
         return textures
 
+    def __is_embedded(self, ext: str) -> bool:
+        """Check if data for the extension is stored in .uasset."""
+        return (self.is_ucas and ext == "uexp") or not self.has_uexp()
+
     def __get_io_base(self, file: str, bin: bytes, rb: bool) -> IOBase:
-        if (self.is_ucas and file.endswith("uexp")) or not self.has_uexp():
+        ext = get_ext(file)
+        if self.__is_embedded(ext):
             opened_io = io.BytesIO(bin if rb else b"")
+        elif not rb and self.memory_files is not None:
+            opened_io = io.BytesIO()
+        elif rb and self.source_binaries is not None and ext in self.source_binaries:
+            opened_io = io.BytesIO(self.source_binaries[ext])
+        elif rb:
+            with open(file, "rb") as f:
+                if ext in ["ubulk", "uptnl"] and os.fstat(f.fileno()).st_size > 0:
+                    # Bulk files only have mipmap data. Let the OS page them in.
+                    opened_io = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    # Read the whole file at once. Small fields will be sliced from the buffer.
+                    opened_io = io.BytesIO(f.read())
         else:
-            opened_io = open(file, "rb" if rb else "wb")
+            opened_io = open(file, "wb")
 
         if rb:
-            return ArchiveRead(opened_io, context=self.get_ar_context())
+            ar = ArchiveRead(opened_io, context=self.get_ar_context())
         else:
-            return ArchiveWrite(opened_io, context=self.get_ar_context())
+            ar = ArchiveWrite(opened_io, context=self.get_ar_context())
+        ar.name = file
+        return ar
 
     def get_io(self, ext="uexp", rb=True) -> IOBase:
         if ext not in self.io_dict or self.io_dict[ext] is None:
@@ -341,9 +433,10 @@ class Uasset:
         else:
             if rb:
                 ar.check(ar.tell(), ar.size)
-        if not rb and ((self.is_ucas and ext == "uexp") or not self.has_uexp()):
-            ar.seek(0)
-            self.bin_dict[ext] = ar.read()
+        if not rb and self.__is_embedded(ext):
+            self.bin_dict[ext] = ar.io.getvalue()
+        elif not rb and self.memory_files is not None:
+            self.memory_files[ext] = ar.io.getvalue()
         ar.close()
         self.io_dict[ext] = None
 
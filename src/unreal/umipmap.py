@@ -1,7 +1,29 @@
 """Mipmap class for texture asset"""
+import functools
+
 from .data_resource import LegacyDataResource, UassetDataResource, BulkDataMapEntry
-from .archive import (ArchiveBase, Int32, Uint32, Uint16, Buffer,
+from .archive import (ArchiveBase, Int32, Uint32, Buffer,
                       SerializableBase)
+from .version import VersionInfo
+
+
+@functools.lru_cache(maxsize=None)
+def get_mipmap_layout(version: str) -> tuple[bool, bool, str, tuple[str]]:
+    """Get version dependent layout of mipmap meta data.
+
+    Notes:
+        Results are cached because all mipmaps in an asset use the same layout.
+
+    Returns:
+        tuple: has bCooked, uses LegacyDataResource, format and names of size fields
+    """
+    ver = VersionInfo(version)
+    int_fmt = "H" if ver == "borderlands3" else "I"
+    if ver >= "4.20":
+        size_fmt, size_names = int_fmt * 3, ("width", "height", "depth")
+    else:
+        size_fmt, size_names = int_fmt * 2, ("width", "height")
+    return ver <= "4.27", ver <= "5.1", size_fmt, size_names
 
 
 class Umipmap(SerializableBase):
@@ -12,6 +34,7 @@ class Umipmap(SerializableBase):
         UnrealEngine/Engine/Source/Runtime/Engine/Public/TextureResource.h
         UnrealEngine/Engine/Source/Runtime/Engine/Private/Texture2D.cpp
     """
+    __slots__ = ("data", "width", "height", "depth", "pixel_num", "data_resource", "data_resource_id")
 
     def __init__(self):
         self.depth = 1
@@ -37,10 +60,11 @@ class Umipmap(SerializableBase):
     def serialize(self, ar: ArchiveBase):
         offset = ar.args[0]
         data_resources = ar.args[1]
-        if ar.version <= "4.27":
+        has_cooked, is_legacy, size_fmt, size_names = get_mipmap_layout(str(ar.version))
+        if has_cooked:
             ar == (Uint32, 1, "bCooked")
 
-        if ar.version <= "5.1":
+        if is_legacy:
             ar << (LegacyDataResource, self, "data_resource", offset)
         else:  # >= "5.2"
             # id for UassetDataResource
@@ -59,14 +83,7 @@ class Umipmap(SerializableBase):
         if self.has_uexp_bulk():
             ar << (Buffer, self, "data", self.data_resource.data_size)
 
-        if ar.version == "borderlands3":
-            int_type = Uint16
-        else:
-            int_type = Uint32
-        ar << (int_type, self, "width")
-        ar << (int_type, self, "height")
-        if ar.version >= "4.20":
-            ar << (int_type, self, "depth")
+        ar.serialize_fields(self, size_fmt, size_names)
         self.pixel_num = self.width * self.height * self.depth
 
     def serialize_ubulk(self, ubulk_ar: ArchiveBase, uptnl_ar: ArchiveBase):
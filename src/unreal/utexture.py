@@ -3,8 +3,18 @@ from .data_resource import BulkType
 from .umipmap import Umipmap
 from .version import VersionInfo
 from directx.dds import DDSHeader, DDS
-from directx.dxgi_format import DXGI_FORMAT, DXGI_BYTE_PER_PIXEL
-from .archive import (ArchiveBase, Bytes, Uint64, Uint32, String, StructArray)
+from directx.dxgi_format import DXGI_FORMAT, DXGI_BITS_PER_PIXEL, get_data_size
+from .archive import (ArchiveBase, Bytes, Buffer, Uint64, Uint32, String, StructArray)
+
+# StripFlags and bCooked at the end of the properties of UTexture2D (or Cube)
+STRIP_FLAGS_PATTERNS = [
+    # \x01\x00 is StripFlags for UTexture
+    # \x01\x00 is StripFlags for UTexture2D (or Cube)
+    # \x01\x00\x00\x00 is bCooked for UTexture2D (or Cube)
+    b"\x01\x00\x01\x00\x01\x00\x00\x00",
+    # The default value of StripFlags is five from UE5.4
+    b"\x05\x00\x05\x00\x01\x00\x00\x00",
+]
 
 # Defined in UnrealEngine/Engine/Source/Runtime/D3D12RHI/Private/D3D12RHI.cpp
 PF_TO_DXGI = {
@@ -60,11 +70,7 @@ PF_TO_UNCOMPRESSED = {
 
 
 def is_power_of_2(n):
-    if n == 1:
-        return True
-    if n % 2 != 0:
-        return False
-    return is_power_of_2(n // 2)
+    return n > 0 and (n & (n - 1)) == 0
 
 
 class Utexture:
@@ -122,31 +128,14 @@ class Utexture:
         start_offset = ar.tell()
         err_offset = min(ar.size - 7, start_offset + 1000)
 
-        while (True):
-            """ Search and skip to \x01\x00\x01\x00\x01\x00\x00\x00.
-            \x01\x00 is StripFlags for UTexture
-            \x01\x00 is StripFlags for UTexture2D (or Cube)
-            \x01\x00\x00\x00 is bCooked for UTexture2D (or Cube)
-
-            Just searching x01 is not the best algorithm but fast enough.
-            Because "found 01" means "found strip flags" for most texture assets.
-            """
-            b = ar.read(1)
-            while (b != b"\x01" and b != b"\x05"):
-                if (ar.tell() >= err_offset):
-                    ar.raise_error()
-                b = ar.read(1)
-
-            b2 = ar.read(7)
-            if b == b"\x01" and b2 == b"\x00\x01\x00\x01\x00\x00\x00":
-                # Found
-                break
-            elif b == b"\x05" and b2 == b"\x00\x05\x00\x01\x00\x00\x00":
-                # The default value of StripFlags is five from UE5.4
-                break
-            else:
-                ar.seek(-7, 1)
-        size = ar.tell() - start_offset
+        # Search and skip to the strip flags and bCooked.
+        # The search range is read at once, and bytes.find does the search in C.
+        binary = ar.read(max(0, err_offset - start_offset) + 7)
+        found = [binary.find(pattern) for pattern in STRIP_FLAGS_PATTERNS]
+        found = [i for i in found if i >= 0]
+        if len(found) == 0:
+            ar.raise_error()
+        size = min(found) + 8
         ar.seek(start_offset)
         return size
 
@@ -193,8 +182,7 @@ class Utexture:
             self.__update_format()
 
         if ar.version == "ff7r" and self.has_opt_data:
-            ar == (Uint32, 0, "?")
-            ar == (Uint32, 0, "?")
+            ar == (Buffer, b"\x00" * 8, "?", 8)
             if ar.is_writing:
                 self.num_mips_in_tail = ubulk_map_num + self.first_mip_to_serialize
             ar << (Uint32, self, "num_mips_in_tail")
@@ -205,12 +193,13 @@ class Utexture:
         if ar.version == "ff7r":
             # ff7r have all mipmap data in a mipmap object
             if ar.is_writing:
-                uexp_bulk = b""
+                uexp_bulk = []
                 for mip in self.mipmaps:
                     if mip.has_uexp_bulk() or mip.has_no_bulk():
                         mip.data_resource.bulk_type = BulkType.NONE
                         mip.data_resource.data_size = 0
-                        uexp_bulk = b"".join([uexp_bulk, mip.data])
+                        uexp_bulk.append(mip.data)
+                uexp_bulk = b"".join(uexp_bulk)
                 size = self.get_max_uexp_size()
                 self.uexp_optional_mip.update(uexp_bulk, size, 1, True)
             ar << (Umipmap, self, "uexp_optional_mip", uasset_size, self.uasset.data_resources)
@@ -255,14 +244,15 @@ class Utexture:
 
         if ar.is_reading:
             if ar.version == "ff7r" and self.has_supported_format():
-                # split mipmap data
+                # split mipmap data (as views of the optional mip to avoid copying)
                 offset = 0
+                optional_data = memoryview(self.uexp_optional_mip.data)
                 for mip in self.mipmaps:
                     if mip.has_uexp_bulk() or mip.has_no_bulk():
-                        size = int(mip.pixel_num * self.byte_per_pixel * self.num_slices)
-                        mip.data = self.uexp_optional_mip.data[offset: offset + size]
+                        size = get_data_size(mip.pixel_num * self.num_slices, self.bits_per_pixel)
+                        mip.data = optional_data[offset: offset + size]
                         offset += size
-                if offset != len(self.uexp_optional_mip.data):
+                if offset != len(optional_data):
                     raise RuntimeError("Failed to split optional mips.")
         else:
             current = ar.tell()
@@ -286,16 +276,10 @@ class Utexture:
         return self.mipmaps[0].width, self.mipmaps[0].height
 
     def get_mipmap_num(self) -> tuple[int, int, int]:
-        uexp_map_num = 0
-        ubulk_map_num = 0
-        uptnl_map_num = 0
-        for mip in self.mipmaps:
-            if mip.has_uexp_bulk() or mip.has_no_bulk():
-                uexp_map_num += 1
-            elif mip.has_uptnl_bulk():
-                uptnl_map_num += 1
-            else:
-                ubulk_map_num += 1
+        bulk_types = [mip.data_resource.bulk_type for mip in self.mipmaps]
+        uexp_map_num = bulk_types.count(BulkType.UEXP) + bulk_types.count(BulkType.NONE)
+        uptnl_map_num = bulk_types.count(BulkType.UPTNL)
+        ubulk_map_num = len(bulk_types) - uexp_map_num - uptnl_map_num
         return uexp_map_num, ubulk_map_num, uptnl_map_num
 
     def rewrite_offset_data(self):
@@ -342,21 +326,19 @@ class Utexture:
         block_size = self.get_block_size()
         for mip in self.mipmaps:
             if not self.is_compressed():
-                bin_sizes.append(int(mip.width * mip.height * self.byte_per_pixel))
+                bin_sizes.append(get_data_size(mip.width * mip.height, self.bits_per_pixel))
                 continue
             # mipmap sizes should be multiples of block_size
             width = cail(mip.width, block_size)
             height = cail(mip.height, block_size)
-            bin_sizes.append(int(width * height * self.byte_per_pixel))
+            bin_sizes.append(get_data_size(width * height, self.bits_per_pixel))
 
         # mip list to slice list
         slice_bin_list = []
         mipmap_size_list = []
         for i in range(self.num_slices):
-            data = b""
-            for mip, size in zip(self.mipmaps, bin_sizes):
-                offset = size * i
-                data = b"".join([data, mip.data[offset: offset + size]])
+            data = b"".join([memoryview(mip.data)[size * i: size * (i + 1)]
+                             for mip, size in zip(self.mipmaps, bin_sizes)])
             slice_bin_list.append(data)
             mipmap_size_list.append([mip.width, mip.height])
 
@@ -397,13 +379,12 @@ class Utexture:
         self.first_mip_to_serialize = 0
         self.mipmaps = [Umipmap() for i in range(len(dds.mipmap_size_list))]
         offset = 0
+        slice_views = [memoryview(slice_bin) for slice_bin in dds.slice_bin_list]
         for size, mip, i in zip(dds.mipmap_size_list, self.mipmaps, range(len(self.mipmaps))):
             mip.init_data_resource(self.uasset)
             # get a mip data from slices
-            data = b""
-            bin_size = int(size[0] * size[1] * self.byte_per_pixel)
-            for slice_bin in dds.slice_bin_list:
-                data = b"".join([data, slice_bin[offset: offset + bin_size]])
+            bin_size = get_data_size(size[0] * size[1], self.bits_per_pixel)
+            data = b"".join([view[offset: offset + bin_size] for view in slice_views])
             offset += bin_size
             if self.has_ubulk and i + 1 < len(self.mipmaps) and size[0] * size[1] > uexp_width * uexp_height:
                 mip.update(data, size, new_depth, False)
@@ -481,10 +462,10 @@ class Utexture:
         if not self.has_supported_format():
             print(f"Warning: Unsupported pixel format. ({self.pixel_format})")
             self.dxgi_format = DXGI_FORMAT.UNKNOWN
-            self.byte_per_pixel = None
+            self.bits_per_pixel = None
             return
         self.dxgi_format = PF_TO_DXGI[self.pixel_format]
-        self.byte_per_pixel = DXGI_BYTE_PER_PIXEL[self.dxgi_format]
+        self.bits_per_pixel = DXGI_BITS_PER_PIXEL[self.dxgi_format]
 
     def __unpack_packed_data(self):
         if self.version >= "4.24" or self.version == "ff7r":
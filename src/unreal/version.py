@@ -10,6 +10,8 @@ Notes:
         <, <=, >, >=: Comparison operators for base_int.
 """
 
+import functools
+
 BASE_VERSIONS = {
     "ff7r": "4.18",
     "borderlands3": "4.22",
@@ -45,7 +47,7 @@ class VersionInfo:
         return new_ver
 
     def __eq__(self, v: str):  # self == string
-        return v in [self.base, self.custom]
+        return v == self.base or v == self.custom
 
     def __ne__(self, v: str):  # self != string
         return self.base != v and self.custom != v
@@ -68,8 +70,13 @@ class VersionInfo:
         return self.base
 
 
+@functools.lru_cache(maxsize=None)
 def version_as_int(ver: str):  # ver (string): like "x.x.x"
-    """Convert a string to int."""
+    """Convert a string to int.
+
+    Notes:
+        Results are cached because serializers compare versions with the same literals many times.
+    """
     ver_str = [int(s) for s in ver.split(".")]
     if len(ver_str) > 3:
         raise RuntimeError(f"Unsupported version info.({ver})")
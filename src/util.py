@@ -1,6 +1,7 @@
 from io import IOBase
 import os
 import platform
+import shutil
 import tempfile
 import sys
 
@@ -9,6 +10,22 @@ def mkdir(dir):
     os.makedirs(dir, exist_ok=True)
 
 
+def copy_file(src: str, dst: str):
+    """Copy a file without reading it in python.
+
+    Notes:
+        It makes a hard link when possible.
+        Or shutil.copyfile will use a fast-copy syscall of the OS.
+        So, dst should not be edited after copy.
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
 def get_os_name():
     return platform.system()
 
@@ -36,16 +53,35 @@ class NonTempDir:
         pass
 
 
-def get_temp_dir(disable_tempfile=False):
+def get_ram_disk(size=0):
+    """Get a memory-backed folder that has enough space for temporary files. (Linux only)"""
+    ram_disk = "/dev/shm"
+    if not is_linux() or not os.path.isdir(ram_disk) or not os.access(ram_disk, os.W_OK):
+        return None
+    stat = os.statvfs(ram_disk)
+    # Leave some space for other processes
+    if stat.f_bavail * stat.f_frsize < size * 2:
+        return None
+    return ram_disk
+
+
+def get_temp_dir(disable_tempfile=False, in_memory_size=0):
+    """Get a context manager for a temporary directory.
+
+    Notes:
+        It will use a RAM disk when in_memory_size is specified and the disk has enough space.
+    """
     if disable_tempfile:
         return NonTempDir("tmp")
+    elif in_memory_size > 0:
+        return tempfile.TemporaryDirectory(dir=get_ram_disk(in_memory_size))
     else:
         return tempfile.TemporaryDirectory()
 
 
 def get_ext(file: str):
     """Get file extension."""
-    return file.split('.')[-1].lower()
+    return file[file.rfind('.') + 1:].lower()
 
 
 def get_size(f: IOBase):
@@ -57,29 +93,25 @@ def get_size(f: IOBase):
 
 
 def compare(file1: str, file2: str):
-    f1 = open(file1, "rb")
-    f2 = open(file2, "rb")
-    print(f"Comparing {file1} and {file2}...")
+    with open(file1, "rb") as f1, open(file2, "rb") as f2:
+        print(f"Comparing {file1} and {file2}...")
+        f1_bin = f1.read()
+        f2_bin = f2.read()
+    compare_binary(f1_bin, f2_bin, file1)
 
-    f1_size = get_size(f1)
-    f2_size = get_size(f2)
 
-    f1_bin = f1.read()
-    f2_bin = f2.read()
-    f1.close()
-    f2.close()
-
-    if f1_size == f2_size and f1_bin == f2_bin:
+def compare_binary(bin1: bytes, bin2: bytes, name: str):
+    if bin1 == bin2:
         print("They have the same data!")
         return
 
     i = 0
-    for b1, b2 in zip(f1_bin, f2_bin):
+    for b1, b2 in zip(bin1, bin2):
         if b1 != b2:
             break
         i += 1
 
-    raise RuntimeError(f"Not the same :{i} ({file1})")
+    raise RuntimeError(f"Not the same :{i} ({name})")
 
 
 def remove_quotes(string: str) -> str:
@@ -105,22 +137,45 @@ def get_base_folder(p: str) -> tuple[str, str]:
     return directory, folder
 
 
-def get_file_list(folder: str, ext: str = None):
-    file_list = get_file_list_rec(folder)
+def get_common_folder(file_list: list[str]) -> str:
+    """Get the deepest folder that contains all the files."""
+    if len(file_list) == 0:
+        raise RuntimeError("Specify at least one file.")
+    folders = [os.path.dirname(os.path.abspath(file)) for file in file_list]
+    drives = sorted({os.path.splitdrive(folder)[0] for folder in folders})
+    if len(drives) > 1:
+        raise RuntimeError(f"Files should be on the same drive. ({', '.join(drives)})")
+    return os.path.commonpath(folders)
+
+
+def get_file_list(folder: str, ext: list[str] = None, file_sizes: dict[str, int] = None):
     if ext is not None:
-        file_list = [f for f in file_list if get_ext(f) in ext]
+        ext = frozenset(ext)
+    file_list = []
+    get_file_list_rec(folder, "", file_list, ext=ext, file_sizes=file_sizes)
     return file_list
 
 
-def get_file_list_rec(folder: str) -> list[str]:
-    file_list = []
-    for file in sorted(os.listdir(folder)):
-        file_path = os.path.join(folder, file)
-        if os.path.isdir(file_path):
-            file_list += [os.path.join(file, f) for f in get_file_list_rec(file_path)]
-        else:
+def get_file_list_rec(folder: str, prefix: str, file_list: list[str], ext: frozenset[str] = None,
+                      file_sizes: dict[str, int] = None):
+    """Add relative paths of files in a folder to file_list.
+
+    Notes:
+        It uses os.scandir to check file types without stat calls.
+        Files will be filtered with ext while scanning.
+        Sizes of all files will be stored in file_sizes if specified. (relative path -> size)
+    """
+    with os.scandir(folder) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    for entry in entries:
+        file = os.path.join(prefix, entry.name) if prefix else entry.name
+        if entry.is_dir():
+            get_file_list_rec(entry.path, file, file_list, ext=ext, file_sizes=file_sizes)
+            continue
+        if file_sizes is not None:
+            file_sizes[file] = entry.stat().st_size
+        if ext is None or get_ext(entry.name) in ext:
             file_list.append(file)
-    return file_list
 
 
 def check_python_version(major, minor):
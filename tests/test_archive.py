@@ -0,0 +1,64 @@
+"""Tests for archive.py"""
+import io
+import struct
+
+import pytest
+from unreal.archive import ArchiveRead, ArchiveWrite, String, Int32Array
+
+
+@pytest.mark.parametrize("string, binary", [
+    (None, b"\x00\x00\x00\x00"),
+    ("", b"\x01\x00\x00\x00\x00"),
+    ("Texture2D", b"\x0A\x00\x00\x00Texture2D\x00"),
+    ("日本語", b"\xFC\xFF\xFF\xFF" + "日本語".encode("utf-16-le") + b"\x00\x00"),
+])
+def test_string(string, binary):
+    """Test String.read and String.write."""
+    ar = ArchiveWrite(io.BytesIO())
+    String.write(ar, string)
+    assert ar.io.getvalue() == binary
+
+    ar = ArchiveRead(io.BytesIO(binary + b"\xFF"))
+    assert String.read(ar) == string
+    assert ar.tell() == len(binary)
+
+
+@pytest.mark.parametrize("binary", [
+    b"\x0A\x00\x00\x00Texture2D",
+    b"\xFC\xFF\xFF\xFF" + "日本語".encode("utf-16-le") + b"\x00",
+    b"\x0A\x00",
+])
+def test_string_truncated(binary):
+    """Test that String.read raises an error for truncated buffers."""
+    ar = ArchiveRead(io.BytesIO(binary))
+    with pytest.raises(RuntimeError) as e:
+        String.read(ar)
+    assert str(e.value).startswith("There is no buffer that has specified size.")
+
+
+class Values:
+    def __init__(self, values=None):
+        self.values = values
+
+
+@pytest.mark.parametrize("endian, prefix", [("little", "<"), ("big", ">")])
+def test_int32_array(endian, prefix):
+    """Test Int32Array.read and Int32Array.write with both byte orders."""
+    values = [0, 1, -2, 0x12345678, -0x80000000]
+    binary = struct.pack(f"{prefix}{len(values)}i", *values)
+
+    ar = ArchiveWrite(io.BytesIO(), endian=endian)
+    ar << (Int32Array, Values(values), "values", len(values))
+    assert ar.io.getvalue() == binary
+
+    obj = Values()
+    ar = ArchiveRead(io.BytesIO(binary), endian=endian)
+    ar << (Int32Array, obj, "values", len(values))
+    assert list(obj.values) == values
+    assert ar.is_eof()
+
+    # Write the array object from read()
+    ar = ArchiveWrite(io.BytesIO(), endian=endian)
+    ar << (Int32Array, obj, "values", len(values))
+    assert ar.io.getvalue() == binary
+    assert list(obj.values) == values  # It should not be byteswapped in place.
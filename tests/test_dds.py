@@ -0,0 +1,73 @@
+"""Tests for dds.py"""
+import os
+
+import pytest
+from directx.dds import DDS, DDSHeader
+from directx.dxgi_format import DXGI_FORMAT
+
+dds_file = os.path.join(os.path.dirname(__file__), "array.dds")
+
+
+def test_header_only():
+    """Test that header_only reads the same header without texture data."""
+    dds = DDS.load(dds_file)
+    header_dds = DDS.load(dds_file, header_only=True)
+    assert bytes(header_dds.header) == bytes(dds.header)
+    assert header_dds.mipmap_size_list == dds.mipmap_size_list
+    assert header_dds.slice_bin_list is None
+
+
+def test_header_only_no_data(tmp_path):
+    """Test that functions that need texture data raise errors for header-only dds."""
+    dds = DDS.load(dds_file, header_only=True)
+    error = "DDS has no texture data. (It was loaded with header_only=True.)"
+    for func in [lambda: dds.save(str(tmp_path / "out.dds")), dds.to_bytes,
+                 dds.get_disassembled_dds_list, lambda: DDS.assemble([dds])]:
+        with pytest.raises(RuntimeError) as e:
+            func()
+        assert str(e.value) == error
+
+
+@pytest.mark.parametrize("header_only", [False, True])
+def test_truncated(tmp_path, header_only):
+    """Test that truncated dds files are rejected."""
+    with open(dds_file, "rb") as f:
+        data = f.read()
+    file = str(tmp_path / "truncated.dds")
+    with open(file, "wb") as f:
+        f.write(data[:-1])
+    with pytest.raises(RuntimeError) as e:
+        DDS.load(file, header_only=header_only)
+    assert str(e.value).startswith("There is no buffer that has specified size.")
+
+
+@pytest.mark.parametrize("fmt, block_size, block_bytes", [
+    ("BC1_UNORM", 4, 8),
+    ("BC7_UNORM", 4, 16),
+    ("ASTC_4X4_UNORM", 4, 16),
+    ("ASTC_6X6_UNORM", 6, 16),
+    ("ASTC_8X8_UNORM", 8, 16),
+    ("ASTC_10X10_UNORM", 10, 16),
+    ("ASTC_12X12_UNORM", 12, 16),
+    ("R8G8B8A8_UNORM", 1, 4),
+])
+def test_get_size_list(fmt, block_size, block_bytes):
+    """Test that mipmap sizes are (number of blocks) * (bytes per block)."""
+    def get_blocks(val):
+        return -(-val // block_size)
+
+    header = DDSHeader()
+    header.update(240, 240, 1, 1, DXGI_FORMAT[fmt], False, 1)
+    _, slice_size = header.get_size_list()
+    assert slice_size == get_blocks(240) ** 2 * block_bytes
+
+    # mipmap chain of a non-square texture
+    header.update(300, 120, 1, 9, DXGI_FORMAT[fmt], False, 1)
+    mipmap_sizes, slice_size = header.get_size_list()
+    expected = 0
+    width, height = 300, 120
+    for _ in range(9):
+        expected += get_blocks(width) * get_blocks(height) * block_bytes
+        width, height = max(1, width // 2), max(1, height // 2)
+    assert len(mipmap_sizes) == 9
+    assert slice_size == expected
@@ -1,11 +1,19 @@
 """Tests for main.py"""
+import io
+import ntpath
 import os
 import shutil
+import time
 
 import pytest
 
 from . import utils_for_tests as util
-from main import main, get_config
+from main import (main, get_config, MODE_FUNCTIONS, convert_to_dds_with_cache, trim_dds_cache,
+                  texture_file_exists, run_tasks, stdout_wrapper, map_textures, prefetch_files,
+                  get_work_size, get_texture_max_workers)
+import util as util_module
+from util import get_file_list, get_common_folder
+from directx.dxgi_format import DXGI_FORMAT
 
 
 def base(json_args):
@@ -149,3 +157,218 @@ def test_empty(json_args):
     base(json_args)
     json_args["mode"] = "export"
     base(json_args)
+
+
+def record_task(folder, file, args, texture_file=None):
+    """Mode function for tests. It writes the file path to the output path."""
+    new_file = os.path.join(args.save_folder, file)
+    with open(new_file, "w") as f:
+        f.write(os.path.join(folder, file))
+
+
+def test_stdin_same_names(tmp_path, monkeypatch):
+    """Test that files from stdin keep their relative folders."""
+    files = [tmp_path / "in" / "a" / "T_Tex.uasset", tmp_path / "in" / "b" / "T_Tex.uasset"]
+    for file in files:
+        file.parent.mkdir(parents=True)
+        file.write_bytes(b"")
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(str(file) for file in files)))
+    monkeypatch.setitem(MODE_FUNCTIONS, "copy", record_task)
+    args = util.Args()
+    args.file = "-"
+    args.mode = "copy"
+    args.version = "4.27"
+    args.max_workers = 1
+    args.save_folder = str(tmp_path / "out")
+    main(args=args)
+    for file, sub in zip(files, ["a", "b"]):
+        with open(tmp_path / "out" / sub / "T_Tex.uasset") as f:
+            assert f.read() == str(file)
+
+
+class FakeTexconv:
+    """Texconv for tests. It copies images as dds files and records converted files."""
+    def __init__(self):
+        self.converted = []
+
+    def convert_to_dds(self, file, dxgi_format, out=None, **kwargs):
+        files = file if isinstance(file, list) else [file]
+        os.makedirs(out, exist_ok=True)
+        dds_files = []
+        for f in files:
+            dds_file = os.path.join(out, os.path.splitext(os.path.basename(f))[0] + ".dds")
+            shutil.copyfile(f, dds_file)
+            dds_files.append(dds_file)
+        self.converted.append(files)
+        return dds_files if isinstance(file, list) else dds_files[0]
+
+
+def test_dds_cache(tmp_path):
+    """Test that only cache misses are converted, and with a texconv call."""
+    images = []
+    for i in range(3):
+        image = tmp_path / f"image{i}.png"
+        image.write_bytes(bytes([i]) * 16)
+        images.append(str(image))
+    cache = str(tmp_path / "cache")
+    texconv = FakeTexconv()
+
+    # miss
+    dds = convert_to_dds_with_cache(texconv, images[0], DXGI_FORMAT.BC1_UNORM, out=str(tmp_path / "out0"),
+                                    cache_folder=cache, no_mip=False, verbose=True, gpu_index=0)
+    assert texconv.converted == [[images[0]]]
+    assert len(os.listdir(cache)) == 1
+
+    # hit (options that don't affect the data are ignored)
+    dds = convert_to_dds_with_cache(texconv, images[0], DXGI_FORMAT.BC1_UNORM, out=str(tmp_path / "out1"),
+                                    cache_folder=cache, no_mip=False, verbose=False, gpu_index=1)
+    assert len(texconv.converted) == 1
+    with open(dds, "rb") as f:
+        assert f.read() == bytes([0]) * 16
+
+    # misses in a list are converted at once
+    dds_list = convert_to_dds_with_cache(texconv, images, DXGI_FORMAT.BC1_UNORM, out=str(tmp_path / "out2"),
+                                         cache_folder=cache, no_mip=False)
+    assert texconv.converted[1:] == [images[1:]]
+    assert [os.path.basename(dds) for dds in dds_list] == ["image0.dds", "image1.dds", "image2.dds"]
+
+    # other options make another cache
+    convert_to_dds_with_cache(texconv, images[0], DXGI_FORMAT.BC1_UNORM, out=str(tmp_path / "out3"),
+                              cache_folder=cache, no_mip=True)
+    assert len(texconv.converted) == 3
+    assert len(os.listdir(cache)) == 4
+
+
+def test_trim_dds_cache(tmp_path):
+    """Test that least recently used files are removed."""
+    for i in range(4):
+        cache_file = tmp_path / f"{i}.dds"
+        cache_file.write_bytes(b"\0" * 100)
+        os.utime(cache_file, (i, i))
+    trim_dds_cache(str(tmp_path), 250)
+    assert sorted(os.listdir(tmp_path)) == ["2.dds", "3.dds"]
+    trim_dds_cache(str(tmp_path / "not_found"), 0)
+
+
+def test_texture_file_exists(tmp_path, monkeypatch):
+    """Test texture file lookup with a directory cache."""
+    (tmp_path / "T_Tex.png").write_bytes(b"")
+    dir_cache = {}
+    assert texture_file_exists(str(tmp_path / "T_Tex.png"), dir_cache)
+    assert not texture_file_exists(str(tmp_path / "T_Tex.dds"), dir_cache)
+    assert not texture_file_exists(str(tmp_path / "not_found" / "T_Tex.png"), dir_cache)
+
+    # A new cache should find new files.
+    (tmp_path / "T_Tex.dds").write_bytes(b"")
+    assert not texture_file_exists(str(tmp_path / "T_Tex.dds"), dir_cache)
+    assert texture_file_exists(str(tmp_path / "T_Tex.dds"), {})
+
+    # Names that only differ in case depend on the volume.
+    assert texture_file_exists(str(tmp_path / "t_tex.PNG"), dir_cache) == os.path.isfile(tmp_path / "t_tex.PNG")
+    monkeypatch.setattr(os.path, "isfile", lambda path: True)  # case-insensitive volume
+    assert texture_file_exists(str(tmp_path / "t_tex.PNG"), dir_cache)
+    assert not texture_file_exists(str(tmp_path / "T_Tex.tga"), dir_cache)
+
+
+@stdout_wrapper
+def print_task(folder, file, args, texture_file=None):
+    """Mode function for tests. It prints the file name."""
+    print(f"task: {file}")
+    if file == "error":
+        raise RuntimeError("Failed.")
+    return file
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_run_tasks_outputs(max_workers, tmp_path, capfd):
+    """Test that outputs of tasks are printed in the main process."""
+    args = util.Args()
+    args.max_workers = max_workers
+    files = ["a", "b", "c", "error"]
+    for file in files:
+        (tmp_path / file).write_bytes(b"")
+    assert run_tasks(print_task, [(str(tmp_path), file, None) for file in files[:3]], args) == files[:3]
+    out = capfd.readouterr().out
+    assert sorted(out.split("\n")[:-1]) == ["task: a", "task: b", "task: c"]
+
+    with pytest.raises(RuntimeError) as e:
+        run_tasks(print_task, [(str(tmp_path), file, None) for file in files[2:]], args)
+    assert str(e.value) == "Failed."
+    assert "task: error" in capfd.readouterr().out
+    if max_workers > 1:
+        # The traceback of the worker process should be kept.
+        assert "print_task" in str(e.value.__cause__)
+
+
+def test_map_textures_outputs(capsys):
+    """Test that outputs of textures are printed in order."""
+    def func(tex, i):
+        print(f"start: {tex}")
+        time.sleep(0.01 * (3 - i))
+        print(f"end: {tex}")
+        return i
+
+    assert map_textures(func, ["a", "b", "c"], range(3), max_workers=3) == [0, 1, 2]
+    assert capsys.readouterr().out == "".join(f"start: {tex}\nend: {tex}\n" for tex in "abc")
+
+
+def test_prefetch_files(tmp_path):
+    """Test that prefetch_files accepts lists and skips missing files."""
+    (tmp_path / "T_Tex.uasset").write_bytes(b"\0" * 16)
+    (tmp_path / "T_Tex.png").write_bytes(b"\0" * 16)
+    prefetch_files(str(tmp_path), ["T_Tex.uasset", "T_Tex.png", "not_found.png"])
+
+
+def test_get_work_size(tmp_path):
+    """Test workload estimation with and without file sizes from get_file_list."""
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "T_Tex.uasset").write_bytes(b"\0" * 10)
+    (tmp_path / "sub" / "T_Tex.uexp").write_bytes(b"\0" * 20)
+    (tmp_path / "sub" / "T_Tex.ubulk").write_bytes(b"\0" * 40)
+    (tmp_path / "T_Tex.png").write_bytes(b"\0" * 80)
+    file_sizes = {}
+    file_list = get_file_list(str(tmp_path), ext=["uasset", "png"], file_sizes=file_sizes)
+    assert file_list == ["T_Tex.png", os.path.join("sub", "T_Tex.uasset")]
+    assert len(file_sizes) == 4
+    for sizes in [file_sizes, None]:
+        assert get_work_size(str(tmp_path), file_list[1], file_sizes=sizes) == 70
+        assert get_work_size(str(tmp_path), file_list, file_sizes=sizes) == 150
+
+
+def texture_workers_task(folder, file, args, texture_file=None):
+    """Mode function for tests. It returns the number of threads for textures."""
+    return get_texture_max_workers(args.max_workers)
+
+
+def test_texture_max_workers(tmp_path):
+    """Test that worker processes use fewer threads for textures."""
+    for file in ["a", "b"]:
+        (tmp_path / file).write_bytes(b"")
+    tasks = [(str(tmp_path), file, None) for file in ["a", "b"]]
+    args = util.Args()
+    args.max_workers = 2
+    expected = max(1, (os.cpu_count() or 1) // 2)
+    assert run_tasks(texture_workers_task, tasks, args) == [expected, expected]
+    # The main process uses max_workers threads.
+    assert get_texture_max_workers(3) == 3
+
+
+@pytest.mark.parametrize("stdin", ["", "\n  \n"])
+def test_stdin_empty(stdin, monkeypatch):
+    """Test that empty stdin is rejected."""
+    monkeypatch.setattr("sys.stdin", io.StringIO(stdin))
+    args = util.Args()
+    args.file = "-"
+    args.mode = "parse"
+    with pytest.raises(RuntimeError) as e:
+        main(args=args)
+    assert str(e.value) == "No file paths in stdin."
+
+
+def test_common_folder_drives(monkeypatch):
+    """Test that files on different drives are rejected."""
+    monkeypatch.setattr(util_module.os, "path", ntpath)
+    assert get_common_folder(["C:\\Game\\a\\T_A.uasset", "C:\\Game\\b\\T_B.uasset"]) == "C:\\Game"
+    with pytest.raises(RuntimeError) as e:
+        get_common_folder(["C:\\Game\\T_A.uasset", "D:\\Game\\T_B.uasset"])
+    assert str(e.value) == "Files should be on the same drive. (C:, D:)"
@@ -1,7 +1,11 @@
-"""Tests for crc.py and version.py"""
+"""Tests for crc.py, version.py, and name maps"""
+import io
+
 import pytest
+from unreal.archive import ArchiveRead, ArchiveWrite
 from unreal.crc import strcrc, strcrc_deprecated
-from unreal.city_hash import city_hash_64, fetch64
+from unreal.import_export import UassetName, ZenName
+from unreal.city_hash import city_hash_64, fetch64, fetch32
 from unreal.version import VersionInfo
 
 test_cases = {
@@ -24,6 +28,21 @@ test_cases = {
          "/ToonLightning/GP29/Texture/T_GP29Lightning_PositionArray",
          fetch64(b"\x58\xCB\xA0\x64\x2F\x3E\x34\x88")),
     ],
+    # Known answers for each code path of city_hash_64. (data: (i * 37 + 11) & 0xFF)
+    "city_hash": [
+        (0, 0x9ae16a3b2f90404f),
+        (3, 0x373a2b2a12e0c581),
+        (4, 0xcc1e778137ae6d69),
+        (8, 0x7d507025ed4eecfd),
+        (16, 0xd836480326a974d6),
+        (17, 0x5cded6cb65c9dac6),
+        (32, 0xa03300e1b2be6da7),
+        (33, 0x6e14215d4c7200d4),
+        (64, 0x2a7ab541551d3235),
+        (65, 0x5709ecef010a51e4),
+        (129, 0x6bb7bad48ee8ebe7),
+        (200, 0xc859bc06968237c1),
+    ],
     "zen_import_hash": [
         ("/Script/Engine/Texture2D", 0x1b93bca796d1fa6f),
         ("/Script/Engine/Default__VolumeTexture", 0x015b0407da6ae563),
@@ -54,6 +73,25 @@ def test_zen_name_hash(name, true_hash):
     assert name_hash == true_hash
 
 
+def get_city_hash_data(length):
+    return bytes((i * 37 + 11) & 0xFF for i in range(length))
+
+
+@pytest.mark.parametrize("length, true_hash", test_cases["city_hash"])
+def test_city_hash(length, true_hash):
+    binary = get_city_hash_data(length)
+    assert city_hash_64(binary) == true_hash
+    # Data that doesn't start at offset 0 of the buffer
+    buf = b"\xFF" * 7 + binary + b"\xFF" * 9
+    assert city_hash_64(memoryview(buf)[7: 7 + length]) == true_hash
+
+
+def test_city_hash_fetch_offset():
+    binary = get_city_hash_data(24)
+    assert fetch64(binary, 5) == fetch64(binary[5:])
+    assert fetch32(binary, 13) == fetch32(binary[13:])
+
+
 @pytest.mark.parametrize("path, true_hash", test_cases["zen_import_hash"])
 def test_zen_import_hash(path, true_hash):
     object_path = path.lower()
@@ -94,3 +132,112 @@ def test_versioninfo_const_error():
     with pytest.raises(Exception) as e:
         VersionInfo('5.0.2.1')
     assert str(e.value) == 'Unsupported version info.(5.0.2.1)'
+
+
+def write_names(names, version, write_array):
+    """Write names with write_array or serialize()."""
+    ar = ArchiveWrite(io.BytesIO(), context={"version": VersionInfo(version)})
+    if write_array:
+        UassetName.write_array(ar, names)
+    else:
+        for name in names:
+            name.serialize(ar)
+    return ar.io.getvalue()
+
+
+@pytest.mark.parametrize("version", ["4.27", "4.11"])
+def test_uasset_name_array(version):
+    """Test that read_array and write_array have the same results as serialize()."""
+    has_hash = version != "4.11"
+    names = []
+    for string in ["Texture2D", "日本語", "", None]:
+        name = UassetName()
+        name.name = string
+        if has_hash:
+            name.hash = strcrc(string or "")
+        names.append(name)
+    binary = write_names(names, version, write_array=True)
+    assert binary == write_names(names, version, write_array=False)
+
+    # Read with some extra bytes after the name map
+    ar = ArchiveRead(io.BytesIO(binary + b"\xFF" * 8), context={"version": VersionInfo(version)})
+    read_names = UassetName.read_array(ar, len(names), ar.size)
+    assert ar.tell() == len(binary)
+    assert [name.name for name in read_names] == ["Texture2D", "日本語", "", None]
+    assert [name.hash for name in read_names] == [name.hash for name in names]
+
+    ar = ArchiveRead(io.BytesIO(binary[:-1]), context={"version": VersionInfo(version)})
+    with pytest.raises(RuntimeError) as e:
+        UassetName.read_array(ar, len(names), ar.size)
+    assert str(e.value).startswith("There is no buffer that has specified size.")
+
+
+def get_zen_names():
+    names = []
+    for string in ["None", "/Game/Textures/T_Test", "日本語", "a" * 300]:
+        name = ZenName()
+        name.update(string, update_hash=True)
+        names.append(name)
+    return names
+
+
+def write_zen_names(names, write_array):
+    """Write UE5 name map with write_array or per-entry serializers."""
+    ar = ArchiveWrite(io.BytesIO(), context={"version": VersionInfo("5.0")})
+    if write_array:
+        ZenName.write_array(ar, names)
+    else:
+        for name in names:
+            name.serialize_hash(ar)
+        for name in names:
+            name.serialize_head(ar)
+        for name in names:
+            name.serialize_string(ar)
+    return ar.io.getvalue()
+
+
+def test_zen_name_array():
+    """Test that ZenName.read_array and write_array have the same results as per-entry serializers."""
+    names = get_zen_names()
+    binary = write_zen_names(names, write_array=True)
+    assert binary == write_zen_names(names, write_array=False)
+
+    # Read with per-entry serializers
+    ar = ArchiveRead(io.BytesIO(binary), context={"version": VersionInfo("5.0")})
+    entry_names = [ZenName() for name in names]
+    for name in entry_names:
+        name.serialize_hash(ar)
+    for name in entry_names:
+        name.serialize_head(ar)
+    for name in entry_names:
+        name.serialize_string(ar)
+
+    # Read at once
+    ar = ArchiveRead(io.BytesIO(binary + b"\xFF" * 8), context={"version": VersionInfo("5.0")})
+    read_names = ZenName.read_array(ar, len(names))
+    assert ar.tell() == len(binary)
+    for read_name, entry_name, name in zip(read_names, entry_names, names):
+        assert (read_name.name, read_name.head, read_name.hash) == (name.name, name.head, name.hash)
+        assert (entry_name.name, entry_name.head, entry_name.hash) == (name.name, name.head, name.hash)
+
+    ar = ArchiveRead(io.BytesIO(binary[:-1]), context={"version": VersionInfo("5.0")})
+    with pytest.raises(RuntimeError) as e:
+        ZenName.read_array(ar, len(names))
+    assert str(e.value).startswith("There is no buffer that has specified size.")
+
+
+def test_zen_name_heads_and_strings():
+    """Test UE4 name map of ucas assets. (Each string follows its header.)"""
+    names = get_zen_names()
+    ar = ArchiveWrite(io.BytesIO(), context={"version": VersionInfo("4.27")})
+    for name in names:
+        name.serialize_head_and_string(ar)
+    binary = ar.io.getvalue()
+    ar = ArchiveWrite(io.BytesIO(), context={"version": VersionInfo("4.27")})
+    ZenName.write_heads_and_strings(ar, names)
+    assert ar.io.getvalue() == binary
+
+    ar = ArchiveRead(io.BytesIO(binary), context={"version": VersionInfo("4.27")})
+    read_names = ZenName.read_heads_and_strings(ar, len(names), ar.size)
+    assert ar.is_eof()
+    assert [(name.name, name.head) for name in read_names] == [(name.name, name.head) for name in names]
@@ -0,0 +1,47 @@
+"""Tests for util.py"""
+import os
+
+import pytest
+from util import get_ext, get_file_list
+
+
+@pytest.mark.parametrize("file, ext", [
+    ("T_Tex.uasset", "uasset"),
+    ("T_Tex.UAsset", "uasset"),
+    ("T_Tex.0.dds", "dds"),
+    (os.path.join("Game", "T_Tex.PNG"), "png"),
+    (".gitignore", "gitignore"),
+    ("README", "readme"),  # The whole name for a file without dots
+])
+def test_get_ext(file, ext):
+    assert get_ext(file) == ext
+
+
+def test_get_file_list(tmp_path):
+    """Test that get_file_list scans nested folders and filters files by extension."""
+    files = [
+        "README",
+        ".gitignore",
+        "T_A.uasset",
+        "T_A.uexp",
+        os.path.join("Sub", "T_B.UASSET"),
+        os.path.join("Sub", "Deep", "T_C.uasset"),
+        os.path.join("Sub", "Deep", "T_C.png"),
+        os.path.join("Sub.uasset", "T_D.png"),  # A folder that looks like a file
+    ]
+    for file in files:
+        path = tmp_path / file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+
+    # Files are sorted by name in each folder.
+    assert get_file_list(str(tmp_path), ext=["uasset"]) == [
+        os.path.join("Sub", "Deep", "T_C.uasset"),
+        os.path.join("Sub", "T_B.UASSET"),
+        "T_A.uasset",
+    ]
+    assert get_file_list(str(tmp_path), ext=["png", "dds"]) == [
+        os.path.join("Sub", "Deep", "T_C.png"),
+        os.path.join("Sub.uasset", "T_D.png"),
+    ]
+    assert sorted(get_file_list(str(tmp_path))) == sorted(files)
@@ -18,6 +18,9 @@ class Args:
         self.image_filter = "linear"
         self.save_detected_version = False
         self.max_workers = -1
+        self.gpu_index = 0
+        self.cache_folder = None
+        self.cache_size = 2.0
 
         if json_args != {}:
             self.init_with_json(json_args)